@@ -10,13 +10,26 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import contextlib
+import functools
+import importlib
+import inspect
+import itertools
 import json
+import os
 import random
+import re
 import sys
-import traceback
-from typing import Any, Callable, Coroutine
-
+import time
+import types
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Coroutine, Mapping
+
+import browser_engine
+import jsonio
 from behavior import HumanBehavior
+from config import Config
 from errors import to_ai_friendly_error
 from proxy_planner import classify_proxy_error
 from snapshot import take_snapshot, paginate_tree
@@ -24,6 +37,53 @@ from snapshot import take_snapshot, paginate_tree
 # Type for action handlers
 ActionHandler = Callable[..., Coroutine[Any, Any, dict]]
 
+# asyncio.timeout() (3.11+) bounds an await in place; wait_for schedules the
+# awaitable as a separate Task on 3.11 and earlier. 3.10 keeps wait_for.
+_HAS_ASYNCIO_TIMEOUT = sys.version_info >= (3, 11)
+
+
+async def _with_timeout(aw: Awaitable[Any], seconds: float) -> Any:
+    """Await `aw`, raising asyncio.TimeoutError once `seconds` elapse."""
+    if _HAS_ASYNCIO_TIMEOUT:
+        async with asyncio.timeout(seconds):
+            return await aw
+    return await asyncio.wait_for(aw, seconds)
+
+
+# ---------------------------------------------------------------------------
+# Playwright per-call overhead (opt-in via BROWSER_USE_FAST=1)
+# ---------------------------------------------------------------------------
+
+# Driver modules that wrap every API call in inspect.stack(0). Patchright is a
+# fork with the same layout, so the Tier 2 fallback gets patched too.
+_PW_CONNECTION_MODULES = ("playwright._impl._connection", "patchright._impl._connection")
+
+
+def _disable_api_stack_capture() -> list[str]:
+    """Stop Playwright from walking the Python stack on every API call.
+
+    Connection.wrap_api_call() calls inspect.stack(0) — which reads source lines
+    for every frame — only to label the call for traces and error prefixes. With
+    many sessions on one event loop that walk dominates CPU. We swap the
+    module's `inspect` for a shim whose stack() is empty; the driver then treats
+    each call as internal. Returns the patched module names.
+    """
+    shim = types.SimpleNamespace(stack=lambda *a, **kw: [], FrameInfo=inspect.FrameInfo)
+    patched = []
+    for mod_name in _PW_CONNECTION_MODULES:
+        try:
+            mod = importlib.import_module(mod_name)
+        except ImportError:
+            continue
+        if getattr(mod, "inspect", None) is inspect:
+            mod.inspect = shim
+            patched.append(mod_name)
+    return patched
+
+
+if Config.FAST_API_CALLS:
+    _disable_api_stack_capture()
+
 # Shadow DOM piercing helpers (injected into page context via evaluate).
 # deepQuery(sel)    — returns first match, recursing into shadow roots.
 # deepQueryAll(sel) — returns all matches across shadow roots.
@@ -47,19 +107,17 @@ DEEP_QUERY_JS = (
 # Ref resolution
 # ---------------------------------------------------------------------------
 
+# Accepted ref spellings: @e1, ref=e1, e1 (surrounding whitespace ignored).
+_REF_RE = re.compile(r"^\s*(?:@|ref=)?(e\d+)\s*$")
+
+
 def parse_ref(ref_str: str) -> str | None:
     """Parse ref argument into canonical form (e.g. 'e1').
 
     Accepts: @e1, ref=e1, e1
     """
-    ref_str = ref_str.strip()
-    if ref_str.startswith("@"):
-        return ref_str[1:]
-    if ref_str.startswith("ref="):
-        return ref_str[4:]
-    if ref_str.startswith("e") and ref_str[1:].isdigit():
-        return ref_str
-    return None
+    m = _REF_RE.match(ref_str)
+    return m.group(1) if m else None
 
 
 async def _resolve_ref(page, ref_str: str, ref_map: dict) -> Any:
@@ -73,13 +131,16 @@ async def _resolve_ref(page, ref_str: str, ref_map: dict) -> Any:
     Returns:
         Playwright Locator or None
     """
-    parsed = parse_ref(ref_str)
-    if parsed is None:
-        return None
-    canonical = f"@{parsed}"
-    ref_data = ref_map.get(canonical)
+    # Agents almost always echo the map key verbatim ('@e1') — hit it directly
+    # and only normalize the other spellings (ref=e1, e1, padded).
+    ref_data = ref_map.get(ref_str)
     if ref_data is None:
-        return None
+        parsed = parse_ref(ref_str)
+        if parsed is None:
+            return None
+        ref_data = ref_map.get(f"@{parsed}")
+        if ref_data is None:
+            return None
 
     role = ref_data.get("role", "")
     name = ref_data.get("name")
@@ -104,6 +165,31 @@ async def _resolve_ref(page, ref_str: str, ref_map: dict) -> Any:
     return locator
 
 
+async def _resolve_ref_cached(page, ref_str: str, session: dict, ref_map: dict | None = None) -> Any:
+    """_resolve_ref with a per-session locator memo.
+
+    Locators are lazy queries built purely from the ref_map entry, so a locator
+    built once is reusable for as long as both the page and the ref_map object are
+    the same — e.g. type then press Enter on one ref. The memo
+    (session["_locator_cache"], threaded from the server's session record) is reset
+    whenever either changes: a new snapshot installs a new map object, a tab switch
+    a new page. It holds the map itself, not id(), so a recycled id can't alias.
+    """
+    if ref_map is None:
+        ref_map = session.get("ref_map", {})
+    cache = session.setdefault("_locator_cache", {})
+    if cache.get("page") is not page or cache.get("ref_map") is not ref_map:
+        cache.clear()
+        cache.update(page=page, ref_map=ref_map, locators={})
+    locators = cache["locators"]
+    locator = locators.get(ref_str)
+    if locator is None:
+        locator = await _resolve_ref(page, ref_str, ref_map)
+        if locator is not None:
+            locators[ref_str] = locator
+    return locator
+
+
 # Substrings that mark a Playwright action failure as a stale/detached/not-found
 # element (vs. a genuine logic error) — used to decide when a ref map refresh is
 # worth attempting.
@@ -165,7 +251,7 @@ async def _resolve_ref_with_refresh(page, ref_str: str, session: dict):
     dict is present the caller returns it verbatim.
     """
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref_str, ref_map)
+    locator = await _resolve_ref_cached(page, ref_str, session, ref_map)
     if locator is not None:
         return locator, False, None
 
@@ -185,7 +271,7 @@ async def _resolve_ref_with_refresh(page, ref_str: str, session: dict):
             "error": f"Ref {ref_str} not found. Take a new snapshot.",
             "ref_refresh_attempted": True,
         }
-    locator = await _resolve_ref(page, ref_str, new_map)
+    locator = await _resolve_ref_cached(page, ref_str, session, new_map)
     if locator is None:
         return None, True, {
             "success": False,
@@ -212,6 +298,132 @@ async def _stale_action_error(page, ref_str: str, session: dict, exc) -> dict:
     return err
 
 
+# ---------------------------------------------------------------------------
+# Humanization
+# ---------------------------------------------------------------------------
+
+def _human_behavior(session: dict) -> HumanBehavior:
+    """Return the session's HumanBehavior for its current humanize intensity.
+
+    HumanBehavior is stateless apart from its intensity, so one instance per
+    intensity is reused across actions. The cache dict lives on the server's
+    session record (threaded through session["_hb_cache"]) so it outlives the
+    per-request session context.
+    """
+    intensity = session.get("humanize_intensity", 1.0)
+    cache = session.setdefault("_hb_cache", {})
+    hb = cache.get(intensity)
+    if hb is None:
+        hb = cache[intensity] = HumanBehavior(intensity=intensity)
+    return hb
+
+
+def _rng(session: dict) -> random.Random:
+    """The session's own Random stream (created at launch; lazily for CLI sessions).
+
+    Keeps sessions' random draws independent instead of interleaving them all
+    through the module-level generator.
+    """
+    rng = session.get("rng")
+    if rng is None:
+        rng = session["rng"] = random.Random()
+    return rng
+
+
+# Post-click settle jitter (seconds), drawn once and cycled. The pool is far
+# longer than any realistic click run, so the cycle is never observable.
+_SETTLE_POOL_SIZE = 4096  # power of two — index with a mask
+_SETTLE_JITTER = [random.uniform(0.2, 0.5) for _ in range(_SETTLE_POOL_SIZE)]
+_settle_idx = itertools.count()
+
+
+def _settle_jitter() -> float:
+    return _SETTLE_JITTER[next(_settle_idx) & (_SETTLE_POOL_SIZE - 1)]
+
+
+# Resolves after the next two animation frames, i.e. once the page has run the
+# handlers for the input we just sent and painted the result.
+_TWO_FRAMES_JS = "() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))"
+_SETTLE_GRACE = 0.05
+
+
+async def _settle(page, window: float = 0.3, *, track_requests: bool = False) -> None:
+    """Let the page react to an input event without a fixed sleep.
+
+    Returns as soon as two frames have rendered and no main-frame navigation or
+    new tab has started. If one has, waits out the rest of `window` so callers
+    comparing page.url / context.pages still see it — the same bound the old
+    blanket sleep gave. With `track_requests` (scroll), requests that start
+    inside the window — lazy-load images, infinite-scroll fetches — are also
+    waited on until they finish, again bounded by `window`.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + window
+    moving = asyncio.Event()
+    idle = asyncio.Event()
+    idle.set()
+    inflight: set = set()
+
+    def _on_request(req) -> None:
+        if req.is_navigation_request() and req.frame == page.main_frame:
+            moving.set()
+        if track_requests:
+            inflight.add(req)
+            idle.clear()
+
+    def _on_request_done(req) -> None:
+        inflight.discard(req)
+        if not inflight:
+            idle.set()
+
+    def _on_page(_page) -> None:
+        moving.set()
+
+    context = page.context
+    page.on("request", _on_request)
+    if track_requests:
+        page.on("requestfinished", _on_request_done)
+        page.on("requestfailed", _on_request_done)
+    context.on("page", _on_page)
+    try:
+        try:
+            await _with_timeout(page.evaluate(_TWO_FRAMES_JS), window)
+        except asyncio.TimeoutError:
+            pass
+        except Exception:
+            moving.set()  # execution context destroyed — a navigation is under way
+        if not moving.is_set():
+            # A click-triggered navigation/popup is queued within a task or two.
+            await asyncio.sleep(_SETTLE_GRACE)
+        remaining = deadline - loop.time()
+        if remaining > 0:
+            if moving.is_set():
+                await asyncio.sleep(remaining)
+            elif not idle.is_set():
+                try:
+                    await _with_timeout(idle.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        page.remove_listener("request", _on_request)
+        if track_requests:
+            page.remove_listener("requestfinished", _on_request_done)
+            page.remove_listener("requestfailed", _on_request_done)
+        context.remove_listener("page", _on_page)
+
+
+async def _nav_title(page, params: dict) -> str | None:
+    """Title for a page-changing action's response, or None with include_title=false.
+
+    page.title() is a driver round-trip; callers that don't read new_title can
+    skip it (server-side block detection then reads the title itself, batched
+    with its body sample).
+    """
+    if params.get("include_title", True):
+        return await page.title()
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Core actions (Phase 1)
 # ---------------------------------------------------------------------------
@@ -219,9 +431,6 @@ async def _stale_action_error(page, ref_str: str, session: dict, exc) -> dict:
 async def action_navigate(page, params: dict, session: dict) -> dict:
     """Navigate to a URL."""
     url = params.get("url")
-    if not url:
-        return {"success": False, "error": "Missing required param: url"}
-
     try:
         session["_last_nav_url"] = url
         await page.goto(url, wait_until="domcontentloaded", timeout=30_000)
@@ -231,7 +440,7 @@ async def action_navigate(page, params: dict, session: dict) -> dict:
             "extracted_content": f"Navigated to {final_url}",
             "page_changed": True,
             "new_url": final_url,
-            "new_title": await page.title(),
+            "new_title": await _nav_title(page, params),
         }
         # SPA re-detection: if the page settled on a different URL than
         # requested, flag it so the agent knows the final destination.
@@ -260,23 +469,18 @@ async def action_click(page, params: dict, session: dict) -> dict:
     to the element before clicking, with random delays.
     """
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     locator, ref_refreshed, ref_err = await _resolve_ref_with_refresh(page, ref, session)
     if ref_err:
         return ref_err
 
     old_url = page.url
-    old_tab_count = len(page.context.pages)
+    context = page.context
+    old_pages = context.pages  # Playwright returns a fresh list — safe to keep
     try:
         if session.get("humanize"):
-            hb = HumanBehavior(intensity=session.get("humanize_intensity", 1.0))
+            hb = _human_behavior(session)
             try:
-                await asyncio.wait_for(
-                    hb.move_to_element(page, locator, click=True),
-                    timeout=15.0,
-                )
+                await _with_timeout(hb.move_to_element(page, locator, click=True), 15.0)
             except asyncio.TimeoutError:
                 # Humanize timed out — fall back to plain click
                 await locator.click(timeout=10_000)
@@ -290,17 +494,21 @@ async def action_click(page, params: dict, session: dict) -> dict:
                 "extracted_content": f"Clicked {ref} — page navigated",
                 "page_changed": True,
                 "new_url": new_url,
-                "new_title": await page.title(),
+                "new_title": await _nav_title(page, params),
             }
             if ref_refreshed:
                 nav_result["ref_refreshed"] = True
             return nav_result
         return await _stale_action_error(page, ref, session, e)
 
-    settle = random.uniform(0.2, 0.5) if session.get("humanize") else 0.3
-    await asyncio.sleep(settle)
+    if session.get("humanize"):
+        await asyncio.sleep(_settle_jitter())
+    else:
+        await _settle(page)
     new_url = page.url
-    new_tab_count = len(page.context.pages)
+    # Identity diff, not a length compare: a tab closing while another opens
+    # leaves the count unchanged but is still a new tab.
+    opened = [p for p in context.pages if p not in old_pages]
 
     result: dict[str, Any] = {
         "success": True,
@@ -312,10 +520,10 @@ async def action_click(page, params: dict, session: dict) -> dict:
 
     if new_url != old_url:
         result["new_url"] = new_url
-        result["new_title"] = await page.title()
+        result["new_title"] = await _nav_title(page, params)
 
-    if new_tab_count > old_tab_count:
-        new_page = page.context.pages[-1]
+    if opened:
+        new_page = opened[-1]
         result["new_tab_opened"] = True
         result["new_tab_url"] = new_page.url
         result["extracted_content"] = f"Clicked {ref} — opened new tab: {new_page.url}"
@@ -327,9 +535,6 @@ async def action_fill(page, params: dict, session: dict) -> dict:
     """Atomic fill — clears field then sets value. For forms."""
     ref = params.get("ref")
     value = params.get("value", "")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     locator, ref_refreshed, ref_err = await _resolve_ref_with_refresh(page, ref, session)
     if ref_err:
         return ref_err
@@ -347,6 +552,45 @@ async def action_fill(page, params: dict, session: dict) -> dict:
         return await _stale_action_error(page, ref, session, e)
 
 
+# Humanized typing is abandoned when it makes no progress for this long — before
+# the first key (covers the mouse move + focus click) and between keys.
+_TYPE_START_STALL = 15.0
+_TYPE_KEY_STALL = 5.0
+
+
+async def _human_type_watched(hb, page, locator, text: str) -> int:
+    """Run hb.human_type under a progress watchdog; return how many chars landed.
+
+    A long string is not a reason to time out — only a stall is — and on a stall
+    the caller resumes from the returned offset instead of retyping everything.
+    """
+    loop = asyncio.get_running_loop()
+    progress = {"typed": 0, "at": loop.time()}
+
+    def _on_key(n: int) -> None:
+        progress["typed"] = n
+        progress["at"] = loop.time()
+
+    task = asyncio.ensure_future(hb.human_type(page, locator, text, clear_first=False, on_key=_on_key))
+    try:
+        while not task.done():
+            limit = _TYPE_KEY_STALL if progress["typed"] else _TYPE_START_STALL
+            idle = loop.time() - progress["at"]
+            if idle >= limit:
+                break
+            await asyncio.wait({task}, timeout=limit - idle)
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    if task.done() and not task.cancelled():
+        task.result()  # re-raise a real failure (e.g. detached element)
+    return progress["typed"]
+
+
 async def action_type(page, params: dict, session: dict) -> dict:
     """Character-by-character typing. For search boxes, compose areas.
 
@@ -356,25 +600,18 @@ async def action_type(page, params: dict, session: dict) -> dict:
     ref = params.get("ref")
     text = params.get("text", "")
     delay = params.get("delay_ms", 50)
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     locator, ref_refreshed, ref_err = await _resolve_ref_with_refresh(page, ref, session)
     if ref_err:
         return ref_err
 
     try:
         if session.get("humanize"):
-            hb = HumanBehavior(intensity=session.get("humanize_intensity", 1.0))
-            try:
-                await asyncio.wait_for(
-                    hb.human_type(page, locator, text, clear_first=False),
-                    timeout=max(15.0, len(text) * 0.2),
-                )
-            except asyncio.TimeoutError:
-                # Humanize timed out — fall back to plain typing
-                await locator.click(timeout=5_000)
-                await locator.press_sequentially(text, delay=delay, timeout=10_000)
+            typed = await _human_type_watched(_human_behavior(session), page, locator, text)
+            if typed < len(text):
+                # Humanize stalled — finish the rest with plain typing
+                if typed == 0:
+                    await locator.click(timeout=5_000)
+                await locator.press_sequentially(text[typed:], delay=delay, timeout=10_000)
         else:
             await locator.press_sequentially(text, delay=delay, timeout=10_000)
         result = {
@@ -403,12 +640,14 @@ async def action_scroll(page, params: dict, session: dict) -> dict:
 
     try:
         if session.get("humanize"):
-            hb = HumanBehavior(intensity=session.get("humanize_intensity", 1.0))
+            hb = _human_behavior(session)
             await hb.smooth_scroll(page, direction=direction, amount=int(amount))
         else:
             delta_y = int(amount) if direction == "down" else -int(amount)
             await page.mouse.wheel(0, delta_y)
-            await asyncio.sleep(0.3)
+            # Scroll doesn't navigate, but it does fire lazy-load/infinite-scroll
+            # fetches — wait for those so the next snapshot includes their content.
+            await _settle(page, track_requests=True)
         return {
             "success": True,
             "extracted_content": f"Scrolled {direction} {abs(int(amount))}px",
@@ -459,82 +698,263 @@ async def action_snapshot(page, params: dict, session: dict) -> dict:
     return result
 
 
-async def _firefox_screenshot_fallback(url: str, full_page: bool = False) -> bytes | None:
-    """Screenshot via temporary Firefox instance (no Chromium headless bugs).
+# Shared, bounded pool for CPU-heavy result encoding. Bounded (unlike the loop's
+# default executor, sized for blocking I/O) so a burst of large screenshots or
+# evaluate results queues predictably instead of spawning a thread each.
+_CPU_POOL = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                               thread_name_prefix="bbu-cpu")
+
+
+async def _off(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a synchronous CPU-bound call on _CPU_POOL without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_CPU_POOL, functools.partial(fn, *args, **kwargs))
+
 
-    Last-resort fallback. No auth/cookies carried over — public pages only.
+async def _b64encode(data: bytes) -> str:
+    """Base64-encode binary output (screenshot/PDF) off the event loop.
+
+    A full-page PNG runs to megabytes; encoding it inline stalls every other
+    session on the event loop. b64encode releases the GIL, so concurrent
+    sessions encode in parallel.
     """
-    try:
-        from playwright.async_api import async_playwright
-        pw = await async_playwright().start()
+    return (await _off(base64.b64encode, data)).decode("ascii")
+
+
+# One CDP session per page, reused across calls instead of attach/detach each time.
+# Weakly keyed so a closed page's entry disappears with it.
+_CDP_SESSIONS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def _cdp_session(page):
+    """Return the page's cached CDPSession, attaching one on first use.
+
+    Chromium only (raises on Firefox). Focus emulation is turned off once at
+    attach so captures don't wait on a focused window.
+    """
+    cdp = _CDP_SESSIONS.get(page)
+    if cdp is None:
+        cdp = await page.context.new_cdp_session(page)
         try:
-            browser = await pw.firefox.launch(headless=True)
-            pg = await browser.new_page(viewport={"width": 1920, "height": 1080})
-            await pg.goto(url, wait_until="domcontentloaded", timeout=15000)
-            data = await pg.screenshot(full_page=full_page, type="png")
-            return data
-        finally:
+            await cdp.send("Emulation.setFocusEmulationEnabled", {"enabled": False})
+        except Exception:
+            pass
+        _CDP_SESSIONS[page] = cdp
+    return cdp
+
+
+async def _drop_cdp_session(page) -> None:
+    """Detach and forget a page's CDP session after a failed send.
+
+    The failure may be the session having detached already, so detach errors
+    are ignored — but a still-attached session must not be left on the page.
+    """
+    cdp = _CDP_SESSIONS.pop(page, None)
+    if cdp is not None:
+        try:
+            await cdp.detach()
+        except Exception:
+            pass
+
+
+# Tier-3 screenshot fallback keeps one headless Firefox alive between calls and
+# gives each capture its own throwaway context. The browser is closed after
+# _FF_IDLE_SECS without use (and at shutdown via close_firefox_pool).
+_FF_IDLE_SECS = 60.0
+_FF_POOL: dict[str, Any] = {
+    "pw": None,
+    "browser": None,
+    "lock": asyncio.Lock(),
+    "users": 0,
+    "last_used": 0.0,
+    "idle_task": None,
+}
+
+
+async def close_firefox_pool() -> None:
+    """Close the pooled fallback Firefox (no-op if it was never started)."""
+    pool = _FF_POOL
+    task = pool["idle_task"]
+    if task is not None and task is not asyncio.current_task():
+        task.cancel()
+    pool["idle_task"] = None
+    browser, pw = pool["browser"], pool["pw"]
+    pool["browser"] = pool["pw"] = None
+    if browser is not None:
+        try:
+            await browser.close()
+        except Exception:
+            pass
+    if pw is not None:
+        try:
+            await pw.stop()
+        except Exception:
+            pass
+
+
+async def _ff_idle_reaper() -> None:
+    pool = _FF_POOL
+    while True:
+        await asyncio.sleep(_FF_IDLE_SECS)
+        async with pool["lock"]:
+            if pool["users"] == 0 and time.monotonic() - pool["last_used"] >= _FF_IDLE_SECS:
+                await close_firefox_pool()
+                return
+
+
+@contextlib.asynccontextmanager
+async def _ff_pool_acquire():
+    """Yield the pooled Firefox browser, launching it on first use."""
+    pool = _FF_POOL
+    async with pool["lock"]:
+        browser = pool["browser"]
+        if browser is None or not browser.is_connected():
+            await close_firefox_pool()
+            from playwright.async_api import async_playwright
+            pw = await async_playwright().start()
             try:
-                await browser.close()
+                browser = await pw.firefox.launch(headless=True)
             except Exception:
-                pass
-            try:
                 await pw.stop()
-            except Exception:
-                pass
+                raise
+            pool["pw"], pool["browser"] = pw, browser
+        pool["users"] += 1
+    try:
+        yield browser
+    finally:
+        pool["users"] -= 1
+        pool["last_used"] = time.monotonic()
+        if pool["idle_task"] is None and pool["browser"] is not None:
+            pool["idle_task"] = asyncio.ensure_future(_ff_idle_reaper())
+
+
+async def _firefox_screenshot_fallback(
+    url: str,
+    full_page: bool = False,
+    image_type: str = "png",
+    quality: int | None = None,
+) -> bytes | None:
+    """Screenshot via the pooled Firefox instance (no Chromium headless bugs).
+
+    Last-resort fallback. Each call gets a fresh context, so no auth/cookies are
+    carried over — public pages only.
+    """
+    try:
+        async with _ff_pool_acquire() as browser:
+            ctx = await browser.new_context(viewport={"width": 1920, "height": 1080})
+            try:
+                pg = await ctx.new_page()
+                await pg.goto(url, wait_until="domcontentloaded", timeout=15000)
+                return await pg.screenshot(full_page=full_page, type=image_type, quality=quality)
+            finally:
+                try:
+                    await ctx.close()
+                except Exception:
+                    pass
     except Exception:
         return None
 
 
-async def action_screenshot(page, params: dict, session: dict) -> dict:
-    """Take a screenshot (base64 PNG).
+def _screenshot_format(params: dict) -> tuple[str, int | None] | str:
+    """Validate screenshot `type`/`quality` params → (image_type, quality) or an error string.
+
+    JPEG trades fidelity for a much smaller payload; quality (0-100) only applies to it.
+    """
+    image_type = params.get("type", "png")
+    if image_type not in ("png", "jpeg"):
+        return f"Invalid type '{image_type}': use 'png' or 'jpeg'"
+    quality = params.get("quality")
+    if quality is None or image_type == "png":
+        return image_type, None
+    try:
+        quality = int(quality)
+    except (TypeError, ValueError):
+        return "quality must be an integer 0-100"
+    if not 0 <= quality <= 100:
+        return "quality must be an integer 0-100"
+    return image_type, quality
+
+
+# Tier 2 (CDP) is started as a hedge once tier 1 has been running this long
+# without a result, instead of only after tier 1's full 15s timeout.
+_SCREENSHOT_HEDGE_SECS = 2.0
+
 
-    Three-tier fallback:
+async def _capture_screenshot(
+    page,
+    tier: int,
+    full_page: bool = False,
+    image_type: str = "png",
+    quality: int | None = None,
+) -> bytes | None:
+    """Capture image bytes with the three-tier fallback; None if every tier failed.
+
+    Shared by action_screenshot and the server's op="screenshot".
     1. Playwright native (15s timeout, font-wait disabled via env var)
-    2. CDP Page.captureScreenshot with optimizeForSpeed (10s timeout)
+    2. CDP Page.captureScreenshot with optimizeForSpeed (10s timeout) — raced
+       against tier 1 when it fails or is still pending after _SCREENSHOT_HEDGE_SECS
     3. Firefox screenshot of same URL (15s, Chromium sessions only, no auth)
     """
-    full_page = params.get("full_page", False)
-
-    # Tier 1: Playwright native
+    async def _native_shot():
+        return await page.screenshot(
+            full_page=full_page, type=image_type, quality=quality, timeout=15000)
+
+    async def _cdp_shot():
+        cdp = await _cdp_session(page)
+        cdp_params: dict = {"format": image_type, "optimizeForSpeed": True}
+        if quality is not None:
+            cdp_params["quality"] = quality
+        if full_page:
+            cdp_params["captureBeyondViewport"] = True
+        result = await cdp.send("Page.captureScreenshot", cdp_params)
+        return base64.b64decode(result["data"])
+
+    # Tier 1, with tier 2 hedged in: first non-empty capture wins.
+    native = asyncio.ensure_future(_native_shot())
+    pending = {native}
     try:
-        data = await page.screenshot(full_page=full_page, type="png", timeout=15000)
-    except Exception:
-        data = None
-
-    # Tier 2: CDP fallback with optimizeForSpeed
-    if data is None:
-        try:
-            async def _cdp_shot():
-                context = page.context
-                cdp = await context.new_cdp_session(page)
-                try:
-                    await cdp.send("Emulation.setFocusEmulationEnabled", {"enabled": False})
-                except Exception:
-                    pass
-                cdp_params: dict = {"format": "png", "optimizeForSpeed": True}
-                if full_page:
-                    cdp_params["captureBeyondViewport"] = True
-                result = await cdp.send("Page.captureScreenshot", cdp_params)
-                await cdp.detach()
-                return base64.b64decode(result["data"])
-            data = await asyncio.wait_for(_cdp_shot(), timeout=10.0)
-        except Exception:
-            data = None
+        await asyncio.wait(pending, timeout=_SCREENSHOT_HEDGE_SECS)
+        if native.done() and native.exception() is None and native.result():
+            return native.result()
+        cdp_task = asyncio.ensure_future(_with_timeout(_cdp_shot(), 10.0))
+        pending = {native, cdp_task} if not native.done() else {cdp_task}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result():
+                    return task.result()
+                if task is cdp_task:
+                    await _drop_cdp_session(page)
+    finally:
+        for task in pending:
+            task.cancel()
 
     # Tier 3: Firefox fallback (skip if already Firefox/Tier 3)
-    if data is None:
-        tier = session.get("tier", 1)
-        if tier in (1, 2):
-            data = await _firefox_screenshot_fallback(page.url, full_page)
+    if tier in (1, 2):
+        return await _firefox_screenshot_fallback(page.url, full_page, image_type, quality)
+    return None
+
 
+async def action_screenshot(page, params: dict, session: dict) -> dict:
+    """Take a screenshot (base64 PNG, or JPEG with type="jpeg" + optional quality).
+
+    See _capture_screenshot for the three-tier fallback.
+    """
+    fmt = _screenshot_format(params)
+    if isinstance(fmt, str):
+        return {"success": False, "error": fmt}
+    image_type, quality = fmt
+
+    data = await _capture_screenshot(
+        page, session.get("tier", 1), params.get("full_page", False), image_type, quality)
     if data is None:
         return {"success": False, "error": "Screenshot failed: Playwright, CDP, and Firefox fallback all timed out (WSL2 headless bug)"}
 
-    b64 = base64.b64encode(data).decode("ascii")
+    b64 = await _b64encode(data)
     return {
         "success": True,
         "screenshot": b64,
+        "type": image_type,
         "extracted_content": f"Screenshot taken ({len(data)} bytes)",
     }
 
@@ -595,6 +1015,30 @@ async def action_wait(page, params: dict, session: dict) -> dict:
     }
 
 
+def _find_frame(page, frame_url: str, session: dict):
+    """First frame of `page` whose URL contains `frame_url`, or None.
+
+    Matches are remembered in session["_frame_cache"] (threaded from the server's
+    session record) so repeated evaluates against the same iframe skip the scan.
+    A cached frame is reused only while it is still attached to this page and its
+    URL still matches — navigation or iframe reloads fall through to a rescan.
+    """
+    cache = session.setdefault("_frame_cache", {})
+    frame = cache.get(frame_url)
+    if (frame is not None and frame.page is page and not frame.is_detached()
+            and frame_url in frame.url):
+        return frame
+    for frame in page.frames:
+        if frame_url in frame.url:
+            cache[frame_url] = frame
+            return frame
+    cache.pop(frame_url, None)
+    return None
+
+
+_EVALUATE_MAX_CHARS = 50_000
+
+
 async def action_evaluate(page, params: dict, session: dict) -> dict:
     """Execute JavaScript on the page and return the result.
 
@@ -602,8 +1046,6 @@ async def action_evaluate(page, params: dict, session: dict) -> dict:
     Set deep_query=true to inject deepQuery()/deepQueryAll() helpers
     that pierce shadow DOM boundaries.
     """
-    from config import Config
-
     if not Config.EVALUATE_ENABLED:
         return {
             "success": False,
@@ -611,9 +1053,6 @@ async def action_evaluate(page, params: dict, session: dict) -> dict:
         }
 
     js = params.get("js", "")
-    if not js:
-        return {"success": False, "error": "Missing required param: js"}
-
     # Inject shadow DOM piercing helpers when requested.
     # Wrapped in IIFE so var declarations + return are valid as an expression.
     if params.get("deep_query"):
@@ -624,25 +1063,24 @@ async def action_evaluate(page, params: dict, session: dict) -> dict:
     try:
         target = page
         if frame_url:
-            # Find matching frame by URL substring
-            for frame in page.frames:
-                if frame_url in frame.url:
-                    target = frame
-                    break
-            else:
+            target = _find_frame(page, frame_url, session)
+            if target is None:
                 return {"success": False, "error": f"No frame matching '{frame_url}' found. Frames: {[f.url[:80] for f in page.frames]}"}
-        result = await asyncio.wait_for(target.evaluate(js), timeout=timeout_s)
-        # Serialize result safely
+        result = await _with_timeout(target.evaluate(js), timeout_s)
+        # Serialize result safely, capping output size. Structured results are
+        # cut during encoding rather than after building the full string.
+        truncated = False
         if result is None:
             content = "null"
         elif isinstance(result, (str, int, float, bool)):
             content = str(result)
+            if len(content) > _EVALUATE_MAX_CHARS:
+                content, truncated = content[:_EVALUATE_MAX_CHARS], True
         else:
-            content = json.dumps(result, indent=2, default=str)
-
-        # Cap output size
-        if len(content) > 50_000:
-            content = content[:50_000] + "\n... [truncated]"
+            content, truncated = await _off(
+                jsonio.dumps_capped, result, _EVALUATE_MAX_CHARS, indent=True, default=str)
+        if truncated:
+            content += "\n... [truncated]"
 
         return {
             "success": True,
@@ -682,17 +1120,14 @@ async def action_done(page, params: dict, session: dict) -> dict:
 async def action_dblclick(page, params: dict, session: dict) -> dict:
     """Double-click an element by ref."""
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
     try:
         await locator.dblclick(timeout=10_000, force=True)
-        await asyncio.sleep(0.3)
+        await _settle(page)
         return {
             "success": True,
             "extracted_content": f"Double-clicked {ref}",
@@ -704,17 +1139,14 @@ async def action_dblclick(page, params: dict, session: dict) -> dict:
 async def action_rightclick(page, params: dict, session: dict) -> dict:
     """Right-click (context menu) an element by ref."""
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
     try:
         await locator.click(button="right", timeout=10_000, force=True)
-        await asyncio.sleep(0.3)
+        await _settle(page)
         return {
             "success": True,
             "extracted_content": f"Right-clicked {ref}",
@@ -726,22 +1158,16 @@ async def action_rightclick(page, params: dict, session: dict) -> dict:
 async def action_hover(page, params: dict, session: dict) -> dict:
     """Hover over an element by ref."""
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
     try:
         if session.get("humanize"):
-            hb = HumanBehavior(intensity=session.get("humanize_intensity", 1.0))
+            hb = _human_behavior(session)
             try:
-                await asyncio.wait_for(
-                    hb.move_to_element(page, locator, click=False),
-                    timeout=15.0,
-                )
+                await _with_timeout(hb.move_to_element(page, locator, click=False), 15.0)
             except (asyncio.TimeoutError, Exception):
                 await locator.hover(timeout=10_000, force=True)
         else:
@@ -750,7 +1176,7 @@ async def action_hover(page, params: dict, session: dict) -> dict:
             except Exception:
                 # Headless actionability fallback — force hover
                 await locator.hover(timeout=10_000, force=True)
-        await asyncio.sleep(0.3)
+        await _settle(page)
         return {"success": True, "extracted_content": f"Hovered over {ref}"}
     except Exception as e:
         return {"success": False, "error": to_ai_friendly_error(e)}
@@ -764,8 +1190,8 @@ async def action_drag(page, params: dict, session: dict) -> dict:
         return {"success": False, "error": "Missing required params: source_ref, target_ref"}
 
     ref_map = session.get("ref_map", {})
-    src_loc = await _resolve_ref(page, src_ref, ref_map)
-    tgt_loc = await _resolve_ref(page, tgt_ref, ref_map)
+    src_loc = await _resolve_ref_cached(page, src_ref, session, ref_map)
+    tgt_loc = await _resolve_ref_cached(page, tgt_ref, session, ref_map)
     if src_loc is None:
         return {"success": False, "error": f"Source ref {src_ref} not found. Take a new snapshot."}
     if tgt_loc is None:
@@ -774,7 +1200,7 @@ async def action_drag(page, params: dict, session: dict) -> dict:
     old_url = page.url
     try:
         await src_loc.drag_to(tgt_loc, timeout=10_000)
-        await asyncio.sleep(0.3)
+        await _settle(page)
         new_url = page.url
         return {
             "success": True,
@@ -788,11 +1214,8 @@ async def action_drag(page, params: dict, session: dict) -> dict:
 async def action_check(page, params: dict, session: dict) -> dict:
     """Check a checkbox (no-op if already checked)."""
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
@@ -806,11 +1229,8 @@ async def action_check(page, params: dict, session: dict) -> dict:
 async def action_uncheck(page, params: dict, session: dict) -> dict:
     """Uncheck a checkbox (no-op if already unchecked)."""
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
@@ -826,13 +1246,10 @@ async def action_press(page, params: dict, session: dict) -> dict:
     key = params.get("key", "")
     ref = params.get("ref")
 
-    if not key:
-        return {"success": False, "error": "Missing required param: key"}
-
     try:
         if ref:
             ref_map = session.get("ref_map", {})
-            locator = await _resolve_ref(page, ref, ref_map)
+            locator = await _resolve_ref_cached(page, ref, session, ref_map)
             if locator is None:
                 return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
             await locator.press(key, timeout=10_000)
@@ -851,11 +1268,8 @@ async def action_select(page, params: dict, session: dict) -> dict:
     """Select a dropdown option."""
     ref = params.get("ref")
     value = params.get("value", "")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
@@ -885,7 +1299,7 @@ async def action_go_back(page, params: dict, session: dict) -> dict:
             "extracted_content": f"Navigated back to {page.url}",
             "page_changed": True,
             "new_url": page.url,
-            "new_title": await page.title(),
+            "new_title": await _nav_title(page, params),
         }
     except Exception as e:
         return {"success": False, "error": to_ai_friendly_error(e)}
@@ -906,21 +1320,37 @@ async def action_go_forward(page, params: dict, session: dict) -> dict:
             "extracted_content": f"Navigated forward to {page.url}",
             "page_changed": True,
             "new_url": page.url,
-            "new_title": await page.title(),
+            "new_title": await _nav_title(page, params),
         }
     except Exception as e:
         return {"success": False, "error": to_ai_friendly_error(e)}
 
 
+# Repeat cookies_get reads within this window (same page URL + domain filter, no
+# other action in between) are served from session["_cookies_cache"].
+_COOKIES_TTL = 2.0
+
+
 async def action_cookies_get(page, params: dict, session: dict) -> dict:
-    """Get cookies, optionally filtered by domain."""
+    """Get cookies, optionally filtered by domain.
+
+    The serialized result is cached for _COOKIES_TTL seconds. execute_action
+    drops the cache before any other action runs, so a navigate/click/
+    cookies_set in between always forces a fresh read.
+    """
     domain = params.get("domain")
+    cache = session.setdefault("_cookies_cache", {})
+    key = (page.url, domain)
+    if cache.get("key") == key and time.monotonic() - cache["ts"] < _COOKIES_TTL:
+        return {"success": True, "extracted_content": cache["json"]}
     try:
         urls = [f"https://{domain}"] if domain else None
         cookies = await page.context.cookies(urls)
+        content = await _off(jsonio.dumps, cookies, indent=True, default=str)
+        cache.update(key=key, ts=time.monotonic(), json=content)
         return {
             "success": True,
-            "extracted_content": json.dumps(cookies, indent=2, default=str),
+            "extracted_content": content,
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -929,8 +1359,6 @@ async def action_cookies_get(page, params: dict, session: dict) -> dict:
 async def action_cookies_set(page, params: dict, session: dict) -> dict:
     """Set cookies."""
     cookies = params.get("cookies", [])
-    if not cookies:
-        return {"success": False, "error": "Missing required param: cookies"}
     try:
         await page.context.add_cookies(cookies)
         return {
@@ -948,19 +1376,14 @@ async def action_cookies_export(page, params: dict, session: dict) -> dict:
         path (str): File path to write cookies JSON.
         domain (str): Optional — only export cookies for this domain.
     """
-    import os
-
     file_path = params.get("path", "")
     domain = params.get("domain")
-    if not file_path:
-        return {"success": False, "error": "Missing required param: path"}
-
     try:
         urls = [f"https://{domain}"] if domain else None
         cookies = await page.context.cookies(urls)
         os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
         with open(file_path, "w") as f:
-            json.dump(cookies, f, indent=2, default=str)
+            f.write(jsonio.dumps(cookies, indent=True, default=str))
         return {
             "success": True,
             "extracted_content": f"Exported {len(cookies)} cookie(s) to {file_path}",
@@ -975,17 +1398,13 @@ async def action_cookies_import(page, params: dict, session: dict) -> dict:
     Params:
         path (str): File path to read cookies JSON from.
     """
-    import os
-
     file_path = params.get("path", "")
-    if not file_path:
-        return {"success": False, "error": "Missing required param: path"}
     if not os.path.isfile(file_path):
         return {"success": False, "error": f"File not found: {file_path}"}
 
     try:
         with open(file_path) as f:
-            cookies = json.load(f)
+            cookies = jsonio.loads(f.read())
         if not isinstance(cookies, list):
             return {"success": False, "error": "Cookie file must contain a JSON array"}
         await page.context.add_cookies(cookies)
@@ -1005,7 +1424,6 @@ async def action_cookies_import(page, params: dict, session: dict) -> dict:
 
 async def action_tab_new(page, params: dict, session: dict) -> dict:
     """Open a new tab."""
-    import browser_engine
     url = params.get("url")
     session_id = session.get("session_id", "")
     new_page = await browser_engine.new_page(session_id, url)
@@ -1021,7 +1439,6 @@ async def action_tab_new(page, params: dict, session: dict) -> dict:
 
 async def action_tab_switch(page, params: dict, session: dict) -> dict:
     """Switch to a tab by index (0-based)."""
-    import browser_engine
     index = params.get("index", 0)
     session_id = session.get("session_id", "")
     switched = await browser_engine.switch_page(session_id, index)
@@ -1037,7 +1454,6 @@ async def action_tab_switch(page, params: dict, session: dict) -> dict:
 
 async def action_tab_close(page, params: dict, session: dict) -> dict:
     """Close a tab by index."""
-    import browser_engine
     index = params.get("index", 0)
     session_id = session.get("session_id", "")
     ok = await browser_engine.close_page(session_id, index)
@@ -1162,7 +1578,15 @@ async def action_webmcp_discover(page, params: dict, session: dict) -> dict:
     async) -> navigator.modelContextTesting.listTools() (Chrome 146-148, sync) -> the
     init-script interceptor + declarative form scan. Captures readOnlyHint,
     untrustedContentHint, and origin per the agent-security guidance.
+
+    Params:
+        format (str): "json" (default) — extracted_content is the discovery result
+            as compact JSON. "dict" — the result is returned as a structured
+            `discovery` field and extracted_content is a one-line summary.
     """
+    fmt = params.get("format", "json")
+    if fmt not in ("json", "dict"):
+        return {"success": False, "error": f"Invalid format '{fmt}': use 'json' or 'dict'"}
     try:
         result = await page.evaluate(_WEBMCP_DISCOVER_JS)
         available = result.get("available", False)
@@ -1177,7 +1601,6 @@ async def action_webmcp_discover(page, params: dict, session: dict) -> dict:
         session["webmcp_tools"] = tool_map
 
         # Also update browser_engine session state
-        import browser_engine
         sid = session.get("session_id", "")
         be_session = browser_engine._sessions.get(sid)
         if be_session:
@@ -1185,14 +1608,20 @@ async def action_webmcp_discover(page, params: dict, session: dict) -> dict:
             be_session["webmcp_tools"] = tool_map
 
         tool_count = len(result.get("tools", []))
-        summary = json.dumps(result, indent=2)
-
-        return {
+        out: dict[str, Any] = {
             "success": True,
-            "extracted_content": summary,
             "webmcp_available": available,
             "tool_count": tool_count,
         }
+        if fmt == "dict":
+            out["extracted_content"] = (
+                f"WebMCP {'available' if available else 'unavailable'} ({source}): "
+                f"{tool_count} tool(s)" + (f" — {', '.join(tool_map)}" if tool_map else "")
+            )
+            out["discovery"] = result
+        else:
+            out["extracted_content"] = jsonio.dumps(result)
+        return out
     except Exception as e:
         session["webmcp_available"] = False
         return {"success": False, "error": to_ai_friendly_error(e)}
@@ -1212,8 +1641,6 @@ async def action_webmcp_call(page, params: dict, session: dict) -> dict:
     # Strict: only an explicit JSON boolean true approves sensitive execution
     # (bool("false") is True in Python — truthy-coercion would bypass the gate).
     allow_sensitive = params.get("allow_sensitive") is True
-    if not tool_name:
-        return {"success": False, "error": "Missing required param: tool"}
 
     # Validate tool exists in session state
     known = session.get("webmcp_tools", {})
@@ -1238,7 +1665,15 @@ async def action_webmcp_call(page, params: dict, session: dict) -> dict:
         except (asyncio.TimeoutError, Exception) as eval_err:
             # Navigation during evaluate destroys the JS context.
             # Check if the URL changed — if so, the tool triggered navigation.
-            await asyncio.sleep(1.0)
+            if page.url == old_url:
+                try:
+                    await page.wait_for_event(
+                        "framenavigated",
+                        predicate=lambda f: f == page.main_frame,
+                        timeout=1_000,
+                    )
+                except Exception:
+                    pass
             new_url = page.url
             if new_url != old_url:
                 return {
@@ -1246,12 +1681,12 @@ async def action_webmcp_call(page, params: dict, session: dict) -> dict:
                     "extracted_content": "Tool triggered navigation (cross-document)",
                     "page_changed": True,
                     "new_url": new_url,
-                    "new_title": await page.title(),
+                    "new_title": await _nav_title(page, params),
                 }
             raise eval_err
 
         # Allow page time to update after tool execution
-        await asyncio.sleep(0.5)
+        await _settle(page, 0.5)
         new_url = page.url
 
         out: dict[str, Any] = {
@@ -1272,13 +1707,13 @@ async def action_webmcp_call(page, params: dict, session: dict) -> dict:
                 out["success"] = False
                 out["error"] = result["error"]
             else:
-                out["extracted_content"] = json.dumps(result, indent=2, default=str)
+                out["extracted_content"] = await _off(jsonio.dumps, result, indent=True, default=str)
         else:
             out["extracted_content"] = str(result) if result else "Tool executed (no return value)"
 
         if new_url != old_url:
             out["new_url"] = new_url
-            out["new_title"] = await page.title()
+            out["new_title"] = await _nav_title(page, params)
 
         return out
     except Exception as e:
@@ -1291,7 +1726,7 @@ async def action_webmcp_call(page, params: dict, session: dict) -> dict:
                     "extracted_content": "Tool triggered navigation",
                     "page_changed": True,
                     "new_url": new_url,
-                    "new_title": await page.title(),
+                    "new_title": await _nav_title(page, params),
                 }
         except Exception:
             pass
@@ -1302,6 +1737,54 @@ async def action_webmcp_call(page, params: dict, session: dict) -> dict:
 # Search & Discovery actions (Phase 2)
 # ---------------------------------------------------------------------------
 
+# ASCII queries are matched by an XPath text() scan that runs natively in the
+# renderer (translate() folds A-Z), so JS only touches nodes that contain the
+# query. Non-ASCII queries need full Unicode case folding and keep the
+# TreeWalker scan.
+_SEARCH_PAGE_JS = """
+(args) => {
+    const query = args.query.toLowerCase();
+    const maxResults = args.maxResults;
+    const results = [];
+    const collect = (node) => {
+        const text = node.textContent.trim();
+        if (!text || text.length < 3) return;
+        const idx = text.toLowerCase().indexOf(query);
+        if (idx === -1) return;
+        const start = Math.max(0, idx - 60);
+        const end = Math.min(text.length, idx + query.length + 60);
+        let snippet = text.slice(start, end).trim();
+        if (start > 0) snippet = '...' + snippet;
+        if (end < text.length) snippet = snippet + '...';
+        const el = node.parentElement;
+        const tag = el ? el.tagName.toLowerCase() : '?';
+        const role = el ? (el.getAttribute('role') || '') : '';
+        results.push({snippet, tag, role});
+    };
+    if (!document.body) return results;
+    if (/^[\\x00-\\x7f]*$/.test(query)) {
+        const lit = !query.includes("'") ? "'" + query + "'"
+            : !query.includes('"') ? '"' + query + '"'
+            : "concat('" + query.split("'").join("', \\"'\\", '") + "')";
+        const it = document.evaluate(
+            ".//text()[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', "
+                + "'abcdefghijklmnopqrstuvwxyz'), " + lit + ")]",
+            document.body, null, XPathResult.ORDERED_NODE_ITERATOR_TYPE, null,
+        );
+        let node;
+        while ((node = it.iterateNext()) && results.length < maxResults) collect(node);
+        return results;
+    }
+    const walker = document.createTreeWalker(
+        document.body, NodeFilter.SHOW_TEXT, null,
+    );
+    let node;
+    while ((node = walker.nextNode()) && results.length < maxResults) collect(node);
+    return results;
+}
+"""
+
+
 async def action_search_page(page, params: dict, session: dict) -> dict:
     """Search for text on the current page.
 
@@ -1318,35 +1801,8 @@ async def action_search_page(page, params: dict, session: dict) -> dict:
 
     max_results = params.get("max_results", 10)
 
-    js = """
-    (args) => {
-        const query = args.query.toLowerCase();
-        const maxResults = args.maxResults;
-        const results = [];
-        const walker = document.createTreeWalker(
-            document.body, NodeFilter.SHOW_TEXT, null,
-        );
-        let node;
-        while ((node = walker.nextNode()) && results.length < maxResults) {
-            const text = node.textContent.trim();
-            if (!text || text.length < 3) continue;
-            const idx = text.toLowerCase().indexOf(query);
-            if (idx === -1) continue;
-            const start = Math.max(0, idx - 60);
-            const end = Math.min(text.length, idx + query.length + 60);
-            let snippet = text.slice(start, end).trim();
-            if (start > 0) snippet = '...' + snippet;
-            if (end < text.length) snippet = snippet + '...';
-            const el = node.parentElement;
-            const tag = el ? el.tagName.toLowerCase() : '?';
-            const role = el ? (el.getAttribute('role') || '') : '';
-            results.push({snippet, tag, role});
-        }
-        return results;
-    }
-    """
     try:
-        matches = await page.evaluate(js, {"query": query, "maxResults": max_results})
+        matches = await page.evaluate(_SEARCH_PAGE_JS, {"query": query, "maxResults": max_results})
         if not matches:
             return {
                 "success": True,
@@ -1362,6 +1818,26 @@ async def action_search_page(page, params: dict, session: dict) -> dict:
         return {"success": False, "error": to_ai_friendly_error(e)}
 
 
+def _ref_index(session: dict, ref_map: dict) -> tuple[dict[str, list[str]], dict[str, str]]:
+    """(refs by lowercased role, lowercased name per ref) for find_elements.
+
+    Built once per ref_map object and kept in session["_ref_index"] (threaded
+    from the server's session record), so repeated queries against the same
+    snapshot skip the full scan and the per-ref lower() calls. The same cache
+    holds a "rows" dict that find_elements fills with formatted result lines.
+    """
+    cache = session.setdefault("_ref_index", {})
+    if cache.get("ref_map") is not ref_map:
+        by_role: dict[str, list[str]] = {}
+        names_lc: dict[str, str] = {}
+        for ref_key, ref_data in ref_map.items():
+            by_role.setdefault((ref_data.get("role") or "").lower(), []).append(ref_key)
+            names_lc[ref_key] = (ref_data.get("name") or "").lower()
+        cache.clear()
+        cache.update(ref_map=ref_map, by_role=by_role, names_lc=names_lc, rows={})
+    return cache["by_role"], cache["names_lc"]
+
+
 async def action_find_elements(page, params: dict, session: dict) -> dict:
     """Find elements matching criteria in the current snapshot's ref map.
 
@@ -1383,16 +1859,18 @@ async def action_find_elements(page, params: dict, session: dict) -> dict:
     if not ref_map:
         return {"success": False, "error": "No snapshot taken yet. Take a snapshot first."}
 
+    by_role, names_lc = _ref_index(session, ref_map)
+    rows = session["_ref_index"]["rows"]  # formatted once per ref per snapshot
+    candidates = by_role.get(role_query, ()) if role_query else ref_map
     matches = []
-    for ref_key, ref_data in ref_map.items():
-        ref_role = (ref_data.get("role") or "").lower()
-        ref_name = (ref_data.get("name") or "").lower()
-
-        if role_query and ref_role != role_query:
-            continue
-        if text_query and text_query not in ref_name:
+    for ref_key in candidates:
+        if text_query and text_query not in names_lc[ref_key]:
             continue
-        matches.append(f"  {ref_key} ({ref_data.get('role', '')}) \"{ref_data.get('name', '')}\"")
+        row = rows.get(ref_key)
+        if row is None:
+            ref_data = ref_map[ref_key]
+            row = rows[ref_key] = f"  {ref_key} ({ref_data.get('role', '')}) \"{ref_data.get('name', '')}\""
+        matches.append(row)
 
     if not matches:
         return {
@@ -1414,11 +1892,8 @@ async def action_get_value(page, params: dict, session: dict) -> dict:
         ref (str): Element ref from snapshot.
     """
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
@@ -1447,11 +1922,8 @@ async def action_get_attributes(page, params: dict, session: dict) -> dict:
         ref (str): Element ref from snapshot.
     """
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
@@ -1466,7 +1938,7 @@ async def action_get_attributes(page, params: dict, session: dict) -> dict:
         }""")
         return {
             "success": True,
-            "extracted_content": json.dumps(attrs, indent=2),
+            "extracted_content": jsonio.dumps(attrs, indent=True),
         }
     except Exception as e:
         return {"success": False, "error": to_ai_friendly_error(e)}
@@ -1481,11 +1953,8 @@ async def action_get_bbox(page, params: dict, session: dict) -> dict:
         ref (str): Element ref from snapshot.
     """
     ref = params.get("ref")
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
@@ -1495,13 +1964,115 @@ async def action_get_bbox(page, params: dict, session: dict) -> dict:
             return {"success": False, "error": f"Element {ref} is not visible (no bounding box)"}
         return {
             "success": True,
-            "extracted_content": json.dumps(box),
+            "extracted_content": jsonio.dumps(box),
             "bbox": box,
         }
     except Exception as e:
         return {"success": False, "error": to_ai_friendly_error(e)}
 
 
+# action_extract markdown cleanup, compiled once rather than per call.
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_MD_TYPED_BLOB_RE = re.compile(r'\{"\$type":[^}]{100,}\}')
+_MD_NESTED_BLOB_RE = re.compile(r'\{"[^"]{5,}":\{[^}]{100,}\}')
+
+
+try:
+    import lxml  # noqa: F401 — optional C parser for extract's HTML → markdown
+    _MD_BS4_PARSER = "lxml"
+except ImportError:
+    _MD_BS4_PARSER = "html.parser"
+
+
+def _md_kept_lines(content: str):
+    """Yield the lines extract keeps: blank, headings, or more than 2 visible chars.
+
+    Runs of empty lines are capped at two (what a \\n{4,} → \\n\\n\\n collapse
+    gives) here rather than by a separate regex pass — that pass restarted at
+    every newline and cost more than the rest of the cleanup together.
+    """
+    blank = 0
+    for line in content.split('\n'):
+        if not line:
+            blank += 1
+            if blank <= 2:
+                yield line
+            continue
+        stripped = line.strip()
+        if len(stripped) > 2 or not stripped or stripped[0] == '#':
+            blank = 0
+            yield line
+
+
+# Body HTML for extract with non-content subtrees dropped in the page, so their
+# source (often the bulk of a modern page) never crosses the driver connection.
+# Works on an inert copy imported into a createHTMLDocument() document rather
+# than a cloneNode in the page's own document: one without a browsing context
+# runs no custom-element constructors and starts no image loads, so the page
+# can't observe the copy. importNode is not a Trusted Types sink (DOMParser and
+# innerHTML assignment are), so pages enforcing require-trusted-types-for still
+# extract. Returns {html, text}: when the stripped body has under 50 characters
+# of text (SPA loading shells, spinners) html is null and text carries what
+# there is, so the caller skips the markdown conversion entirely. textContent on
+# the inert copy avoids the layout flush innerText would force.
+_EXTRACT_BODY_JS = """
+(includeLinks) => {
+    if (!document.body) return {html: '', text: ''};
+    const clone = document.implementation.createHTMLDocument('').importNode(document.body, true);
+    clone.querySelectorAll('script,style,noscript,svg,iframe').forEach(n => n.remove());
+    if (!clone.hasChildNodes()) return {html: '', text: ''};
+    if (!includeLinks) {
+        const text = clone.textContent.replace(/\\s+/g, ' ').trim();
+        if (text.length < 50) return {html: null, text};
+    }
+    return {html: clone.innerHTML, text: null};
+}
+"""
+
+
+@functools.cache
+def _markdownify() -> Callable[..., str] | None:
+    """markdownify's converter, imported on first extract (None if not installed).
+
+    Deferred rather than a top-level import: it pulls in BeautifulSoup (~50ms),
+    which one-shot CLI actions that never extract shouldn't pay for.
+    """
+    try:
+        from markdownify import markdownify
+    except ImportError:
+        return None
+    return markdownify
+
+
+# &nbsp; survives parsing as U+00A0 and CRLF line endings as a stray \r; normalize
+# both over the finished markdown in one C-level pass.
+_MD_WS_TABLE = str.maketrans({"\xa0": " ", "\r": None})
+
+
+def _html_to_markdown(md: Callable[..., str], html: str, include_links: bool) -> str:
+    """HTML → cleaned markdown. Pure CPU (BeautifulSoup + markdownify) — run via _off."""
+    content = md(
+        html,
+        heading_style="ATX",
+        strip=["script", "style", "noscript", "svg"],
+        bullets="-",
+        escape_asterisks=False,
+        escape_underscores=False,
+        escape_misc=False,
+        autolinks=False,
+        bs4_options=_MD_BS4_PARSER,
+    ).translate(_MD_WS_TABLE)
+
+    if not include_links:
+        content = _MD_LINK_RE.sub(r'\1', content)
+
+    # Light cleanup: remove JSON blobs (blank runs are collapsed in _md_kept_lines)
+    content = _MD_TYPED_BLOB_RE.sub('', content)
+    content = _MD_NESTED_BLOB_RE.sub('', content)
+
+    return '\n'.join(_md_kept_lines(content)).strip()
+
+
 async def action_extract(page, params: dict, session: dict) -> dict:
     """Extract page content as clean markdown.
 
@@ -1512,48 +2083,28 @@ async def action_extract(page, params: dict, session: dict) -> dict:
         max_chars (int): Maximum characters to return (default 30000).
         include_links (bool): Include link URLs in markdown (default false).
     """
-    import re
-
     max_chars = params.get("max_chars", 30_000)
     include_links = params.get("include_links", False)
 
-    try:
-        from markdownify import markdownify as md
-    except ImportError:
+    md = _markdownify()
+    if md is None:
         return {
             "success": False,
             "error": "markdownify not installed. Run: uv pip install markdownify",
         }
 
     try:
-        html = await page.evaluate("() => document.body.innerHTML")
-        if not html:
+        body = await page.evaluate(_EXTRACT_BODY_JS, bool(include_links))
+        html = body["html"]
+        if html is None:
+            # Near-empty body: its text is the whole extract, no parse needed
+            content = body["text"]
+        elif not html:
             return {"success": False, "error": "Empty page body"}
-
-        content = md(
-            html,
-            heading_style="ATX",
-            strip=["script", "style", "noscript", "svg"],
-            bullets="-",
-            escape_asterisks=False,
-            escape_underscores=False,
-            escape_misc=False,
-            autolinks=False,
-        )
-
-        if not include_links:
-            content = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', content)
-
-        # Light cleanup: collapse whitespace, remove JSON blobs
-        content = re.sub(r'\n{4,}', '\n\n\n', content)
-        content = re.sub(r'\{"\$type":[^}]{100,}\}', '', content)
-        content = re.sub(r'\{"[^"]{5,}":\{[^}]{100,}\}', '', content)
-
-        lines = content.split('\n')
-        lines = [l for l in lines if len(l.strip()) > 2
-                 or not l.strip()
-                 or l.strip().startswith('#')]
-        content = '\n'.join(lines).strip()
+        else:
+            # Parsing a large body is tens-to-hundreds of ms of pure Python — keep it
+            # off the event loop so other sessions' actions aren't stalled behind it.
+            content = await _off(_html_to_markdown, md, html, include_links)
 
         truncated = False
         if len(content) > max_chars:
@@ -1584,6 +2135,31 @@ async def action_extract(page, params: dict, session: dict) -> dict:
 # File & coordinate actions (Phase 2)
 # ---------------------------------------------------------------------------
 
+# Locate the file input for an upload ref in a single evaluate. kind is
+# "self", "child", "ancestor" (selector set when the input has an id/name),
+# or "none" — the caller then falls back to a page-wide search.
+_FIND_FILE_INPUT_JS = """
+(el) => {
+    const SEL = 'input[type="file"]';
+    if (el.tagName === 'INPUT' && el.type === 'file') return {kind: 'self', selector: null};
+    if (el.querySelector(SEL)) return {kind: 'child', selector: null};
+    let current = el;
+    for (let i = 0; i < 3 && current; i++) {
+        current = current.parentElement;
+        if (!current) break;
+        const fi = current.querySelector(SEL);
+        if (fi) {
+            let selector = null;
+            if (fi.id) selector = '#' + CSS.escape(fi.id);
+            else if (fi.name) selector = 'input[type="file"][name="' + CSS.escape(fi.name) + '"]';
+            return {kind: 'ancestor', selector};
+        }
+    }
+    return {kind: 'none', selector: null};
+}
+"""
+
+
 async def action_upload_file(page, params: dict, session: dict) -> dict:
     """Upload a file to a file input element.
 
@@ -1591,75 +2167,31 @@ async def action_upload_file(page, params: dict, session: dict) -> dict:
         ref (str): Ref near the upload area (button or file input).
         path (str): Absolute path to the file on the server filesystem.
     """
-    import os
-
     ref = params.get("ref")
     file_path = params.get("path", "")
 
-    if not ref:
-        return {"success": False, "error": "Missing required param: ref"}
-    if not file_path:
-        return {"success": False, "error": "Missing required param: path"}
     if not os.path.isfile(file_path):
         return {"success": False, "error": f"File not found: {file_path}"}
 
     ref_map = session.get("ref_map", {})
-    locator = await _resolve_ref(page, ref, ref_map)
+    locator = await _resolve_ref_cached(page, ref, session, ref_map)
     if locator is None:
         return {"success": False, "error": f"Ref {ref} not found. Take a new snapshot."}
 
-    js_find_file_input = """
-    (el) => {
-        if (el.tagName === 'INPUT' && el.type === 'file') return true;
-        if (el.querySelector('input[type="file"]')) return true;
-        let current = el;
-        for (let i = 0; i < 3 && current; i++) {
-            current = current.parentElement;
-            if (!current) break;
-            if (current.querySelector('input[type="file"]')) return true;
-        }
-        return false;
-    }
-    """
-
     try:
-        # Check if ref itself or nearby is a file input
-        has_file_input = await locator.evaluate(js_find_file_input)
-
-        if has_file_input:
-            # Find file input scoped to the ref element or its ancestors
-            js_get_file_input = """
-            (el) => {
-                if (el.tagName === 'INPUT' && el.type === 'file') return null;  // el itself
-                let fi = el.querySelector('input[type="file"]');
-                if (fi) return null;  // child — use locator-scoped search below
-                let current = el;
-                for (let i = 0; i < 3 && current; i++) {
-                    current = current.parentElement;
-                    if (!current) break;
-                    fi = current.querySelector('input[type="file"]');
-                    if (fi) {
-                        // Return a selector for this specific input
-                        if (fi.id) return '#' + CSS.escape(fi.id);
-                        if (fi.name) return 'input[type="file"][name="' + CSS.escape(fi.name) + '"]';
-                        return null;  // fallback to locator-scoped
-                    }
-                }
-                return null;
-            }
-            """
-            specific_selector = await locator.evaluate(js_get_file_input)
-
-            if specific_selector:
-                file_locator = page.locator(specific_selector).first
+        # One round-trip: is the ref, a descendant, or a near ancestor's
+        # descendant a file input — and if the latter, how to address it.
+        found = await locator.evaluate(_FIND_FILE_INPUT_JS)
+        kind = found["kind"]
+
+        if kind != "none":
+            if kind == "child":
+                file_locator = locator.locator('input[type="file"]').first
+            elif kind == "ancestor" and found["selector"]:
+                file_locator = page.locator(found["selector"]).first
             else:
-                # Ref is or contains the file input — scope search to locator
-                child_input = locator.locator('input[type="file"]')
-                if await child_input.count() > 0:
-                    file_locator = child_input.first
-                else:
-                    # Ref itself is the file input
-                    file_locator = locator
+                # Ref itself is the file input (or an unaddressable ancestor match)
+                file_locator = locator
             await file_locator.set_input_files(file_path)
         else:
             # Last resort: any file input on the page
@@ -1708,21 +2240,21 @@ async def action_click_coordinate(page, params: dict, session: dict) -> dict:
     old_url = page.url
     try:
         if session.get("humanize"):
-            hb = HumanBehavior(intensity=session.get("humanize_intensity", 1.0))
-            await page.mouse.move(x, y, steps=random.randint(5, 12))
-            await asyncio.sleep(random.uniform(0.05, 0.15))
+            rng = _rng(session)
+            await page.mouse.move(x, y, steps=rng.randint(5, 12))
+            await asyncio.sleep(rng.uniform(0.05, 0.15))
             await page.mouse.click(x, y)
         else:
             await page.mouse.click(x, y)
 
-        await asyncio.sleep(0.3)
+        await _settle(page)
         new_url = page.url
         return {
             "success": True,
             "extracted_content": f"Clicked at ({x}, {y})",
             "page_changed": new_url != old_url,
             "new_url": new_url if new_url != old_url else None,
-            "new_title": await page.title() if new_url != old_url else None,
+            "new_title": await _nav_title(page, params) if new_url != old_url else None,
         }
     except Exception as e:
         return {"success": False, "error": f"Coordinate click failed: {to_ai_friendly_error(e)}"}
@@ -1780,7 +2312,7 @@ async def action_pdf(page, params: dict, session: dict) -> dict:
             format=params.get("format", "A4"),
             print_background=params.get("print_background", True),
         )
-        b64 = base64.b64encode(data).decode("ascii")
+        b64 = await _b64encode(data)
         return {
             "success": True,
             "pdf": b64,
@@ -1873,8 +2405,6 @@ async def action_storage_set(page, params: dict, session: dict) -> dict:
     key = params.get("key")
     value = params.get("value")
 
-    if not key:
-        return {"success": False, "error": "Missing required param: key"}
     if value is None:
         return {"success": False, "error": "Missing required param: value"}
     if store not in ("local", "session"):
@@ -1932,8 +2462,9 @@ async def action_rotate_fingerprint(page, params: dict, session: dict) -> dict:
     primary_lang = langs[0] if langs else "en-US"
 
     # Hardware variance (consistent per fingerprint via domain seed)
-    hw_concurrency = random.choice([4, 6, 8, 12])
-    device_memory = random.choice([4, 8, 16])
+    rng = _rng(session)
+    hw_concurrency = rng.choice([4, 6, 8, 12])
+    device_memory = rng.choice([4, 8, 16])
 
     js = (
         "(() => {"
@@ -1971,7 +2502,7 @@ async def action_rotate_fingerprint(page, params: dict, session: dict) -> dict:
 # Action registry
 # ---------------------------------------------------------------------------
 
-ACTION_HANDLERS: dict[str, ActionHandler] = {
+_ACTION_HANDLERS: dict[str, ActionHandler] = {
     # Core (Phase 1)
     "navigate": action_navigate,
     "click": action_click,
@@ -2031,6 +2562,46 @@ ACTION_HANDLERS: dict[str, ActionHandler] = {
     "rotate_fingerprint": action_rotate_fingerprint,
 }
 
+# Public, read-only view. The registry is fixed at import, which is what lets the
+# derived tables below be computed once.
+ACTION_HANDLERS: Mapping[str, ActionHandler] = types.MappingProxyType(_ACTION_HANDLERS)
+
+# Listed in the unknown-action error.
+_AVAILABLE_ACTIONS = ", ".join(sorted(_ACTION_HANDLERS))
+
+# Dispatch is a single hash probe through this pre-bound lookup. A match/case over
+# the action names compiles to sequential string compares (no jump table), so it
+# would be slower for everything past the first few cases.
+_get_handler = _ACTION_HANDLERS.get
+
+# Params that must be present and non-empty, checked once in execute_action before
+# dispatch. Checks with other semantics stay in their handlers: 0 is a valid
+# x/y/width/height, storage_set accepts any non-None value, drag accepts `ref` as
+# an alias for source_ref, and search_page rejects whitespace-only queries.
+_REQUIRED_PARAMS: dict[str, tuple[str, ...]] = {
+    "navigate": ("url",),
+    "click": ("ref",),
+    "dblclick": ("ref",),
+    "rightclick": ("ref",),
+    "fill": ("ref",),
+    "type": ("ref",),
+    "evaluate": ("js",),
+    "press": ("key",),
+    "select": ("ref",),
+    "cookies_set": ("cookies",),
+    "cookies_export": ("path",),
+    "cookies_import": ("path",),
+    "webmcp_call": ("tool",),
+    "get_value": ("ref",),
+    "get_attributes": ("ref",),
+    "get_bbox": ("ref",),
+    "upload_file": ("ref", "path"),
+    "hover": ("ref",),
+    "check": ("ref",),
+    "uncheck": ("ref",),
+    "storage_set": ("key",),
+}
+
 
 async def execute_action(
     page,
@@ -2049,14 +2620,25 @@ async def execute_action(
     Returns:
         ActionResult-like dict
     """
-    handler = ACTION_HANDLERS.get(action_name)
+    handler = _get_handler(action_name)
     if handler is None:
         return {
             "success": False,
             "error": f"Unknown action: {action_name}. "
-                     f"Available: {', '.join(sorted(ACTION_HANDLERS))}",
+                     f"Available: {_AVAILABLE_ACTIONS}",
         }
 
+    missing = [k for k in _REQUIRED_PARAMS.get(action_name, ()) if not params.get(k)]
+    if missing:
+        noun = "param" if len(missing) == 1 else "params"
+        return {"success": False, "error": f"Missing required {noun}: {', '.join(missing)}"}
+
+    if action_name != "cookies_get":
+        # Anything else may change the jar (navigation, clicks, evaluate, cookies_set).
+        cookies_cache = session.get("_cookies_cache")
+        if cookies_cache:
+            cookies_cache.clear()
+
     try:
         return await handler(page, params, session)
     except Exception as e:
@@ -2071,23 +2653,34 @@ async def execute_action(
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    def _emit(obj: dict) -> None:
+        # Binary stdout: jsonio.dumpb already yields UTF-8, skip the text-layer re-encode.
+        sys.stdout.buffer.write(jsonio.dumpb(obj, default=str) + b"\n")
+        sys.stdout.buffer.flush()
+
     async def main():
-        request = json.loads(sys.stdin.read())
+        request = jsonio.loads(sys.stdin.buffer.read())
         action_name = request.get("action")
-        params = request.get("params", {})
+        action_list = request.get("actions")
         session_id = request.get("session_id")
 
-        if not action_name:
-            print(json.dumps({"success": False, "error": "Missing action name"}))
+        # Batch form (same shape as the server's op="actions"):
+        #   {"session_id": ..., "actions": [{"action": ..., "params": {...}}, ...],
+        #    "stop_on_error": true}
+        # One process, one page lookup, one ref_map threaded through every step.
+        if action_list is not None and not isinstance(action_list, list):
+            _emit({"success": False, "error": "Invalid 'actions' list"})
+            return
+        if not action_name and not action_list:
+            _emit({"success": False, "error": "Missing action name"})
             return
         if not session_id:
-            print(json.dumps({"success": False, "error": "Missing session_id"}))
+            _emit({"success": False, "error": "Missing session_id"})
             return
 
-        import browser_engine
         page = await browser_engine.get_page(session_id)
         if page is None:
-            print(json.dumps({"success": False, "error": f"Session {session_id} not found"}))
+            _emit({"success": False, "error": f"Session {session_id} not found"})
             return
 
         # Build session context
@@ -2096,12 +2689,38 @@ if __name__ == "__main__":
             "ref_map": request.get("ref_map", {}),
         }
 
-        result = await execute_action(page, action_name, params, session_ctx)
+        async def _run(name: str, params: dict) -> dict:
+            result = await execute_action(page, name, params, session_ctx)
+            # Include updated ref_map if snapshot was taken
+            if "ref_map" in session_ctx and name == "snapshot":
+                result["refs"] = session_ctx["ref_map"]
+            return result
 
-        # Include updated ref_map if snapshot was taken
-        if "ref_map" in session_ctx and action_name == "snapshot":
-            result["refs"] = session_ctx["ref_map"]
+        if not action_list:
+            _emit(await _run(action_name, request.get("params", {})))
+            return
 
-        print(json.dumps(result, default=str))
+        stop_on_error = request.get("stop_on_error", True)
+        results = []
+        stopped_at = None
+        for i, step in enumerate(action_list):
+            if not isinstance(step, dict) or not step.get("action"):
+                r = {"success": False, "error": f"Action at index {i} missing 'action' field"}
+            else:
+                r = await _run(step["action"], step.get("params", {}))
+            results.append(r)
+            if not r.get("success", False) and stop_on_error:
+                stopped_at = i
+                break
+        out = {"success": stopped_at is None, "results": results, "stopped_at": stopped_at}
+        if stopped_at is not None:
+            out["error"] = results[stopped_at].get("error", "Action failed")
+        _emit(out)
+
+    async def _cli():
+        try:
+            await main()
+        finally:
+            await close_firefox_pool()
 
-    asyncio.run(main())
+    asyncio.run(_cli())
@@ -19,13 +19,13 @@ Operations:
 from __future__ import annotations
 
 import asyncio
-import json
 import sys
 import os
 
 # Ensure scripts/ is on the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import jsonio
 from config import Config
 
 
@@ -210,53 +210,30 @@ async def handle_request(request: dict) -> dict:
 
 
 def _truncate_result(result: dict, original_bytes: int) -> dict:
-    """Truncate oversized result while preserving success/error semantics.
-
-    Instead of replacing the entire result with a new success=True dict,
-    truncate the largest string fields and add truncation metadata.
-    """
-    max_bytes = Config.MAX_SNAPSHOT_BYTES
-    truncated_fields = []
-
-    # Identify string fields that can be truncated, sorted by size descending
-    trunc_candidates = []
-    for key, val in result.items():
-        if isinstance(val, str) and key not in ("success", "error"):
-            trunc_candidates.append((key, len(val)))
-    trunc_candidates.sort(key=lambda x: x[1], reverse=True)
-
-    # Truncate largest fields until output fits
-    out = dict(result)
-    for key, size in trunc_candidates:
-        serialized = json.dumps(out, default=str)
-        if len(serialized) <= max_bytes:
-            break
-        # Estimate how much to cut from this field
-        overshoot = len(serialized) - max_bytes
-        field_val = out[key]
-        new_len = max(0, len(field_val) - overshoot - 200)  # extra margin for metadata
-        out[key] = field_val[:new_len] + f"... [truncated from {len(field_val)} chars]"
-        truncated_fields.append(key)
-
-    out["truncated"] = True
-    out["truncated_fields"] = truncated_fields
-    out["original_bytes"] = original_bytes
-    return out
+    """Truncate an oversized result to Config.MAX_SNAPSHOT_BYTES (see jsonio.truncate_result)."""
+    return jsonio.truncate_result(result, original_bytes, Config.MAX_SNAPSHOT_BYTES)
+
+
+def _emit(output: bytes) -> None:
+    """Write serialized JSON straight to binary stdout (no text-layer re-encode)."""
+    sys.stdout.buffer.write(output + b"\n")
+    sys.stdout.buffer.flush()
 
 
 async def main():
     """Read JSON from stdin, process, write JSON to stdout."""
     Config.ensure_dirs()
 
-    raw = sys.stdin.read()
+    # Raw bytes: the parser handles UTF-8 itself, no separate text decode pass.
+    raw = sys.stdin.buffer.read()
     if not raw.strip():
-        print(json.dumps({"success": False, "error": "Empty input"}))
+        _emit(jsonio.dumpb({"success": False, "error": "Empty input"}))
         return
 
     try:
-        request = json.loads(raw)
-    except json.JSONDecodeError as e:
-        print(json.dumps({"success": False, "error": f"Invalid JSON: {e}"}))
+        request = jsonio.loads(raw)
+    except ValueError as e:
+        _emit(jsonio.dumpb({"success": False, "error": f"Invalid JSON: {e}"}))
         return
 
     try:
@@ -268,12 +245,12 @@ async def main():
         }
 
     # Serialize and output
-    output = json.dumps(result, default=str)
+    output = jsonio.dumpb(result, default=str)
 
     # Hard cap output size to prevent context corruption
     if len(output) > Config.MAX_SNAPSHOT_BYTES:
         result = _truncate_result(result, len(output))
-        output = json.dumps(result, default=str)
+        output = jsonio.dumpb(result, default=str)
         # Re-check — nested data (refs, etc.) may keep it over limit
         if len(output) > Config.MAX_SNAPSHOT_BYTES:
             result = {
@@ -284,9 +261,9 @@ async def main():
                 "message": "Response exceeded size limit even after field truncation. "
                            "Use a more targeted request to reduce output size.",
             }
-            output = json.dumps(result, default=str)
+            output = jsonio.dumpb(result, default=str)
 
-    print(output)
+    _emit(output)
 
 
 if __name__ == "__main__":
@@ -15,7 +15,7 @@ Key differences from browser-ai:
 
 from __future__ import annotations
 
-import time
+from time import monotonic_ns as _monotonic_ns
 from typing import Callable
 
 from config import Config
@@ -29,70 +29,90 @@ StateChangeListener = Callable[[FSMState, FSMState], None]
 # Valid transitions (analogous to browser-ai VALID_TRANSITIONS)
 # ---------------------------------------------------------------------------
 
-VALID_TRANSITIONS: dict[AgentStateName, list[AgentStateName]] = {
-    AgentStateName.IDLE: [
+VALID_TRANSITIONS: dict[AgentStateName, frozenset[AgentStateName]] = {
+    AgentStateName.IDLE: frozenset({
         AgentStateName.LAUNCHING,
-    ],
-    AgentStateName.LAUNCHING: [
+    }),
+    AgentStateName.LAUNCHING: frozenset({
         AgentStateName.OBSERVING,
         AgentStateName.ERROR,
-    ],
-    AgentStateName.OBSERVING: [
+    }),
+    AgentStateName.OBSERVING: frozenset({
         AgentStateName.PLANNING,
         AgentStateName.ERROR,
-    ],
-    AgentStateName.PLANNING: [
+    }),
+    AgentStateName.PLANNING: frozenset({
         AgentStateName.ACTING,
         AgentStateName.DONE,       # agent decides task is complete from plan
         AgentStateName.ERROR,
-    ],
-    AgentStateName.ACTING: [
+    }),
+    AgentStateName.ACTING: frozenset({
         AgentStateName.EVALUATING,
         AgentStateName.ERROR,
-    ],
-    AgentStateName.EVALUATING: [
+    }),
+    AgentStateName.EVALUATING: frozenset({
         AgentStateName.OBSERVING,   # normal loop: evaluate → re-observe
         AgentStateName.ESCALATING,  # needs tier escalation
         AgentStateName.DONE,        # task complete
         AgentStateName.ERROR,
-    ],
-    AgentStateName.ESCALATING: [
+    }),
+    AgentStateName.ESCALATING: frozenset({
         AgentStateName.LAUNCHING,   # relaunch at higher tier
         AgentStateName.ERROR,
-    ],
-    AgentStateName.RECOVERING: [
+    }),
+    AgentStateName.RECOVERING: frozenset({
         AgentStateName.OBSERVING,   # recovered, re-observe
         AgentStateName.ESCALATING,  # recovery failed, escalate
         AgentStateName.ERROR,
-    ],
-    AgentStateName.DONE: [
+    }),
+    AgentStateName.DONE: frozenset({
         AgentStateName.TEARING_DOWN,
         AgentStateName.IDLE,        # reset for new task
-    ],
-    AgentStateName.ERROR: [
+    }),
+    AgentStateName.ERROR: frozenset({
         AgentStateName.RECOVERING,
         AgentStateName.TEARING_DOWN,
         AgentStateName.IDLE,
-    ],
-    AgentStateName.TEARING_DOWN: [
+    }),
+    AgentStateName.TEARING_DOWN: frozenset({
         AgentStateName.IDLE,
-    ],
+    }),
 }
 
 # States that can be aborted (cancel in-progress work)
-ABORTABLE_STATES: set[AgentStateName] = {
+ABORTABLE_STATES: frozenset[AgentStateName] = frozenset({
     AgentStateName.OBSERVING,
     AgentStateName.PLANNING,
     AgentStateName.ACTING,
     AgentStateName.EVALUATING,
     AgentStateName.ESCALATING,
     AgentStateName.RECOVERING,
+})
+
+# Terminal states (task finished, either way) and states with no work in flight
+TERMINAL_STATES: frozenset[AgentStateName] = frozenset({
+    AgentStateName.DONE,
+    AgentStateName.ERROR,
+})
+
+INACTIVE_STATES: frozenset[AgentStateName] = frozenset({
+    AgentStateName.IDLE,
+    AgentStateName.DONE,
+    AgentStateName.ERROR,
+    AgentStateName.TEARING_DOWN,
+})
+
+
+# Per-state deadline, keyed by the enum itself: _set_state does one dict probe
+# instead of a .value property read plus a string-keyed lookup per transition.
+_DEADLINES: dict[AgentStateName, int | None] = {
+    state: Config.FSM_DEADLINES.get(state.value) for state in AgentStateName
 }
 
 
 def is_valid_transition(from_state: AgentStateName, to_state: AgentStateName) -> bool:
-    allowed = VALID_TRANSITIONS.get(from_state, [])
-    return to_state in allowed
+    # Every AgentStateName has an entry, so this is one dict probe + one set probe
+    return to_state in VALID_TRANSITIONS[from_state]
 
 
 def can_abort(state: AgentStateName) -> bool:
@@ -120,7 +140,10 @@ class AgentFSM:
             since_ms=_now_ms(),
             epoch=0,
         )
-        self._listeners: list[StateChangeListener] = []
+        # Immutable tuple, replaced on (un)subscribe: _notify iterates whatever
+        # tuple was current, so a listener that subscribes or unsubscribes
+        # mid-notify can't skip or repeat another listener.
+        self._listeners: tuple[StateChangeListener, ...] = ()
 
     @property
     def state(self) -> FSMState:
@@ -136,28 +159,29 @@ class AgentFSM:
 
     def subscribe(self, listener: StateChangeListener) -> Callable[[], None]:
         """Register a state change listener. Returns unsubscribe function."""
-        self._listeners.append(listener)
+        self._listeners += (listener,)
         def unsub() -> None:
+            remaining = list(self._listeners)
             try:
-                self._listeners.remove(listener)
+                remaining.remove(listener)
             except ValueError:
-                pass
+                return
+            self._listeners = tuple(remaining)
         return unsub
 
     def snapshot(self) -> FSMState:
-        """Return a copy of current state for diagnostics."""
-        return self._state.model_copy()
+        """Return current state for diagnostics.
+
+        FSMState is frozen and every transition installs a new instance, so
+        the current object is already a stable snapshot — no copy needed.
+        """
+        return self._state
 
     def is_terminal(self) -> bool:
-        return self._state.name in (AgentStateName.DONE, AgentStateName.ERROR)
+        return self._state.name in TERMINAL_STATES
 
     def is_active(self) -> bool:
-        return self._state.name not in (
-            AgentStateName.IDLE,
-            AgentStateName.DONE,
-            AgentStateName.ERROR,
-            AgentStateName.TEARING_DOWN,
-        )
+        return self._state.name not in INACTIVE_STATES
 
     def elapsed_ms(self) -> int:
         return _now_ms() - self._state.since_ms
@@ -214,9 +238,8 @@ class AgentFSM:
         """Increment epoch (on abort, tier escalation, recovery).
 
         Returns the new epoch. Any in-flight work with a stale epoch
-        should be discarded.
+        should be discarded — see accept().
         """
-        now = _now_ms()
         prev = self._state
         self._state = FSMState(
             name=prev.name,
@@ -227,6 +250,15 @@ class AgentFSM:
         self._notify(prev)
         return self._state.epoch
 
+    def accept(self, epoch: int) -> bool:
+        """True if work started under `epoch` is still current.
+
+        Async continuations capture fsm.epoch when they start and check
+        `if not fsm.accept(epoch): return` on resumption, before building
+        results or driving a transition for an abandoned attempt.
+        """
+        return epoch == self._state.epoch
+
     # -- Internals --------------------------------------------------------
 
     def _transition(self, to: AgentStateName) -> None:
@@ -247,7 +279,7 @@ class AgentFSM:
 
     def _set_state(self, name: AgentStateName, epoch: int) -> None:
         now = _now_ms()
-        deadline = Config.FSM_DEADLINES.get(name.value)
+        deadline = _DEADLINES[name]
         self._state = FSMState(
             name=name,
             since_ms=now,
@@ -264,4 +296,6 @@ class AgentFSM:
 
 
 def _now_ms() -> int:
-    return int(time.time() * 1000)
+    # Monotonic, not wall-clock: since_ms only feeds elapsed/deadline math, which
+    # must not jump with NTP or DST adjustments. Integer ns avoids float math.
+    return _monotonic_ns() // 1_000_000
@@ -13,9 +13,10 @@ stdlib only, no external dependencies.
 
 import random
 import asyncio
+import functools
 import math
 from dataclasses import dataclass
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Callable, Optional
 
 
 @dataclass
@@ -25,6 +26,59 @@ class Point:
     y: float
 
 
+# Last known cursor position from the in-page mousemove tracker, or null when
+# this document has no tracker yet.
+_MOUSE_POS_JS = """(() => {
+    const t = window.__bbu_mouse;
+    return t ? {x: t.x, y: t.y} : null;
+})()"""
+
+# Same read, but installs the tracker when it's missing — one round-trip for
+# the first move in a document instead of a read followed by an install.
+# Installed per document rather than via add_init_script, which breaks DNS
+# on Patchright (Chrome 143+).
+_MOUSE_TRACK_JS = """(() => {
+    const t = window.__bbu_mouse;
+    if (t) return {x: t.x, y: t.y};
+    window.__bbu_mouse = {x: 0, y: 0};
+    document.addEventListener('mousemove', e => {
+        window.__bbu_mouse.x = e.clientX;
+        window.__bbu_mouse.y = e.clientY;
+    }, {passive: true});
+    return null;
+})()"""
+
+
+@functools.lru_cache(maxsize=64)
+def _bezier_basis(steps: int) -> Tuple[Tuple[float, float, float, float], ...]:
+    """Cubic Bernstein weights (b0, b1, b2, b3) at t = i/steps for i in 0..steps.
+
+    They depend only on `steps` (20 to a few hundred, clustered by distance),
+    so each distinct count is computed once per process.
+    """
+    basis = []
+    for i in range(steps + 1):
+        t = i / steps
+        u = 1 - t
+        basis.append((u ** 3, 3 * u ** 2 * t, 3 * u * t ** 2, t ** 3))
+    return tuple(basis)
+
+
+@functools.lru_cache(maxsize=64)
+def _ease_speed_factors(steps: int) -> Tuple[float, ...]:
+    """Ease-in-out speed factor for each of `steps` movement steps.
+
+    Deterministic per step count, like _bezier_basis, so only the per-step
+    jitter is drawn for each move.
+    """
+    factors = []
+    for i in range(steps):
+        t = i / steps
+        ease = t * t * (3 - 2 * t)
+        factors.append(0.5 + abs(0.5 - ease))
+    return tuple(factors)
+
+
 class BezierCurve:
     """Generate Bezier curve points for natural mouse movement.
 
@@ -63,22 +117,18 @@ class BezierCurve:
             start[1] + dy * 0.67 + perp_y * offset * random.uniform(-0.5, 0.5),
         )
 
+        # Bernstein weights are cached per step count and shared by both axes
+        # (same operation order as the per-axis form, so identical output).
+        sx, sy = start
+        ex, ey = end
+        c1x, c1y = cp1
+        c2x, c2y = cp2
         points = []
-        for i in range(steps + 1):
-            t = i / steps
-            x = (
-                (1 - t) ** 3 * start[0]
-                + 3 * (1 - t) ** 2 * t * cp1[0]
-                + 3 * (1 - t) * t ** 2 * cp2[0]
-                + t ** 3 * end[0]
-            )
-            y = (
-                (1 - t) ** 3 * start[1]
-                + 3 * (1 - t) ** 2 * t * cp1[1]
-                + 3 * (1 - t) * t ** 2 * cp2[1]
-                + t ** 3 * end[1]
-            )
-            points.append((int(x), int(y)))
+        for b0, b1, b2, b3 in _bezier_basis(steps):
+            points.append((
+                int(b0 * sx + b1 * c1x + b2 * c2x + b3 * ex),
+                int(b0 * sy + b1 * c1y + b2 * c2y + b3 * ey),
+            ))
 
         return points
 
@@ -93,10 +143,7 @@ class BezierCurve:
         Humans slow down at the start and end of movements (ease-in-out).
         """
         delays = []
-        for i in range(steps):
-            t = i / steps if steps > 0 else 0
-            ease = t * t * (3 - 2 * t)
-            speed_factor = 0.5 + abs(0.5 - ease)
+        for speed_factor in _ease_speed_factors(steps):
             delay = base_delay_ms * speed_factor * (1 + (random.random() - 0.5) * variance)
             delays.append(max(1, delay))
 
@@ -178,15 +225,18 @@ class HumanTyping:
         page: Any,
         text: str,
         intensity: float = 1.0,
+        on_key: Optional[Callable[[int], None]] = None,
     ) -> None:
         """Type text character-by-character with human-like timing.
 
         Uses page.keyboard.type() for each character individually,
         applying realistic inter-key delays. At intensity >= 0.8,
         injects occasional typos (wrong adjacent key → backspace → correct).
+        on_key, if given, is called with the count of characters typed so far
+        after each one lands.
         """
         prev_char = ""
-        for char in text:
+        for i, char in enumerate(text, 1):
             delay = cls.get_inter_key_delay(char, prev_char, intensity)
             await asyncio.sleep(delay / 1000)
 
@@ -205,6 +255,8 @@ class HumanTyping:
 
             await page.keyboard.type(char)
             prev_char = char
+            if on_key is not None:
+                on_key(i)
 
 
 class ReadingBehavior:
@@ -274,23 +326,11 @@ class HumanBehavior:
             click: Whether to click after moving
         """
         try:
-            current_pos = await page.evaluate("""(() => {
-                const t = window.__bbu_mouse;
-                return t ? {x: t.x, y: t.y} : null;
-            })()""")
+            current_pos = await page.evaluate(_MOUSE_TRACK_JS)
             if current_pos:
                 start = (current_pos["x"], current_pos["y"])
             else:
-                # First movement — inject tracker and use viewport center
-                await page.evaluate("""(() => {
-                    if (!window.__bbu_mouse) {
-                        window.__bbu_mouse = {x: 0, y: 0};
-                        document.addEventListener('mousemove', e => {
-                            window.__bbu_mouse.x = e.clientX;
-                            window.__bbu_mouse.y = e.clientY;
-                        }, {passive: true});
-                    }
-                })()""")
+                # First movement in this document — tracker just installed, use viewport center
                 vp = page.viewport_size
                 start = (vp["width"] // 2 if vp else 500, vp["height"] // 2 if vp else 300)
         except Exception:
@@ -320,9 +360,17 @@ class HumanBehavior:
             steps, base_delay_ms=5 * self.intensity
         )
 
+        # Pace against absolute deadlines: each step's delay is measured from the
+        # previous step's due time, not from when its mouse.move IPC returned,
+        # so round-trip latency is absorbed instead of stretching every step.
+        loop = asyncio.get_running_loop()
+        due = loop.time()
         for point, delay in zip(points, delays):
             await page.mouse.move(point[0], point[1])
-            await asyncio.sleep(delay / 1000)
+            due += delay / 1000
+            remaining = due - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
 
         if click:
             await asyncio.sleep(random.uniform(0.05, 0.15) * self.intensity)
@@ -334,6 +382,7 @@ class HumanBehavior:
         locator: Any,
         text: str,
         clear_first: bool = False,
+        on_key: Optional[Callable[[int], None]] = None,
     ) -> None:
         """Type text with human-like timing into a locator.
 
@@ -342,6 +391,7 @@ class HumanBehavior:
             locator: Playwright Locator
             text: Text to type
             clear_first: Whether to clear existing content first
+            on_key: Progress callback, see HumanTyping.type_text
         """
         await self.move_to_element(page, locator, click=True)
         await asyncio.sleep(random.uniform(0.1, 0.3) * self.intensity)
@@ -352,7 +402,7 @@ class HumanBehavior:
             await page.keyboard.press("Backspace")
             await asyncio.sleep(0.1)
 
-        await self.typing.type_text(page, text, self.intensity)
+        await self.typing.type_text(page, text, self.intensity, on_key=on_key)
 
     async def smooth_scroll(
         self,
@@ -402,10 +452,7 @@ class HumanBehavior:
     async def random_micro_movement(self, page: Any) -> None:
         """Perform small random mouse movement (humans rarely keep mouse still)."""
         try:
-            current = await page.evaluate("""(() => {
-                const t = window.__bbu_mouse;
-                return t ? {x: t.x, y: t.y} : null;
-            })()""")
+            current = await page.evaluate(_MOUSE_POS_JS)
             cx = current["x"] if current else 500
             cy = current["y"] if current else 300
             x = cx + random.randint(-30, 30)
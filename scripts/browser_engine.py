@@ -12,14 +12,18 @@ from __future__ import annotations
 
 import abc
 import asyncio
+import functools
+import importlib.util
 import json
+import os
+import random
 import re
 import sys
 import time
-import uuid
 from pathlib import Path
 from typing import Any
 
+import jsonio
 from config import Config, validate_profile_name, safe_profile_path, get_geo_config
 from proxy_planner import plan_proxy, proxy_to_url, geo_mismatch_warning, ports_list
 from errors import _scrub_credentials
@@ -88,6 +92,12 @@ def _run_cmd(*args: str) -> None:
     subprocess.check_call(args)
 
 
+# The _ensure_* steps shell out to the installers, which costs a subprocess
+# spawn (and a browser-cache check) on every launch even when everything is
+# already present. functools.cache makes each one run once per process; a
+# failed attempt raises, isn't cached, and is retried on the next launch.
+
+@functools.cache
 def _ensure_playwright_chromium() -> None:
     """Install playwright + Chromium browser if missing."""
     try:
@@ -97,6 +107,7 @@ def _ensure_playwright_chromium() -> None:
     _run_cmd(sys.executable, "-m", "playwright", "install", "chromium")
 
 
+@functools.cache
 def _ensure_patchright() -> None:
     """Install patchright + Chromium browser if missing."""
     try:
@@ -106,6 +117,7 @@ def _ensure_patchright() -> None:
     _run_cmd(sys.executable, "-m", "patchright", "install", "chromium")
 
 
+@functools.cache
 def _ensure_camoufox() -> None:
     """Install camoufox[geoip] + playwright + fetch Firefox binary if missing."""
     try:
@@ -152,6 +164,35 @@ TRACKER_PATTERNS: list[str] = [
 ]
 
 
+
+def _glob_to_regex(glob: str) -> str:
+    """Translate a Playwright URL glob to an anchored regex source.
+
+    Covers the subset TRACKER_PATTERNS uses, with Playwright's semantics: `*`
+    matches within one path segment, a `**` segment matches across segments
+    (`**/` may also match nothing), everything else is literal.
+    """
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        if glob.startswith("**", i) and (i == 0 or glob[i - 1] == "/"):
+            i += 2
+            if glob.startswith("/", i):
+                out.append("(?:.*/)?")
+                i += 1
+            else:
+                out.append(".*")
+            continue
+        out.append("[^/]*" if glob[i] == "*" else re.escape(glob[i]))
+        i += 1
+    return "^" + "".join(out) + "$"
+
+
+# All tracker globs as one regex, compiled once at import and shared by every
+# session's route (Playwright matches re.Pattern routes with .search()).
+_TRACKER_RE = re.compile("|".join(f"(?:{_glob_to_regex(p)})" for p in TRACKER_PATTERNS))
+
+
 # ---------------------------------------------------------------------------
 # WebMCP init script — fallback interceptor for the publisher registration API.
 # Origin Trial (Chrome 149-156) exposes document.modelContext; pre-OT builds (146-148)
@@ -212,18 +253,28 @@ WEBMCP_INIT_SCRIPT = """
 
     // --- Scan declarative tools (forms with toolname attribute) ---
     // Runs after DOM is ready; re-scanned on webmcp_discover action.
+    const formsOf = Object.getOwnPropertyDescriptor(Document.prototype, 'forms').get;
+    const elementsOf = Object.getOwnPropertyDescriptor(HTMLFormElement.prototype, 'elements').get;
     const scanDeclarativeForms = () => {
         window.__webmcp.declarative = {};
-        document.querySelectorAll('form[toolname]').forEach(form => {
+        // document.forms / form.elements / el.options are maintained by the DOM,
+        // so the scan involves no selector parsing or subtree matching. The
+        // collections are read through their prototype getters: a field named
+        // "elements" (or a form named "forms") would otherwise shadow them.
+        for (const form of formsOf.call(document)) {
             const name = form.getAttribute('toolname');
+            if (name === null) continue;
             const desc = form.getAttribute('tooldescription') || '';
             const autoSubmit = form.hasAttribute('toolautosubmit');
             const schema = { type: 'object', properties: {}, required: [] };
 
-            form.querySelectorAll('input, select, textarea').forEach(el => {
-                if (el.type === 'submit' || el.type === 'hidden') return;
+            for (const el of elementsOf.call(form)) {
+                const tag = el.tagName;
+                if (tag !== 'INPUT' && tag !== 'SELECT' && tag !== 'TEXTAREA') continue;
+                const type = el.type;
+                if (type === 'submit' || type === 'hidden') continue;
                 const paramName = el.getAttribute('toolparamtitle') || el.name;
-                if (!paramName) return;
+                if (!paramName) continue;
 
                 const paramDesc = el.getAttribute('toolparamdescription')
                     || el.labels?.[0]?.textContent?.trim()
@@ -231,21 +282,22 @@ WEBMCP_INIT_SCRIPT = """
 
                 let prop = { description: paramDesc };
 
-                if (el.tagName === 'SELECT') {
+                if (tag === 'SELECT') {
                     prop.type = 'string';
                     prop.enum = [];
                     prop.oneOf = [];
-                    el.querySelectorAll('option').forEach(opt => {
-                        if (opt.value) {
-                            prop.enum.push(opt.value);
-                            prop.oneOf.push({ const: opt.value, title: opt.textContent.trim() });
+                    for (const opt of el.options) {
+                        const value = opt.value;
+                        if (value) {
+                            prop.enum.push(value);
+                            prop.oneOf.push({ const: value, title: opt.textContent.trim() });
                         }
-                    });
-                } else if (el.type === 'checkbox') {
+                    }
+                } else if (type === 'checkbox') {
                     prop.type = 'boolean';
-                } else if (el.type === 'number' || el.type === 'range') {
+                } else if (type === 'number' || type === 'range') {
                     prop.type = 'number';
-                } else if (el.type === 'radio') {
+                } else if (type === 'radio') {
                     // Radio groups share a name — collect all values
                     if (!schema.properties[paramName]) {
                         prop.type = 'string';
@@ -264,7 +316,7 @@ WEBMCP_INIT_SCRIPT = """
                 if (el.required && !schema.required.includes(paramName)) {
                     schema.required.push(paramName);
                 }
-            });
+            }
 
             window.__webmcp.declarative[name] = {
                 name: name,
@@ -275,7 +327,7 @@ WEBMCP_INIT_SCRIPT = """
                     : 'form[toolname="' + CSS.escape(name) + '"]',
                 _type: 'declarative',
             };
-        });
+        }
     };
 
     if (document.readyState === 'loading') {
@@ -366,9 +418,35 @@ WEBMCP_INIT_SCRIPT = """
 """
 
 
+_JS_TRAILING_COMMENT_RE = re.compile(r"\s+//[^'\"`]*$")
+
+
+def _minify_js(src: str) -> str:
+    """Drop comments, indentation and blank lines from a trusted inline script.
+
+    Line-based on purpose: newlines are kept so automatic semicolon insertion
+    behaves exactly as in the source. Only whole-line `//` comments and trailing
+    ones with no quote characters after them are removed — enough for the
+    scripts in this module, not a general-purpose minifier.
+    """
+    lines = []
+    for line in src.splitlines():
+        line = line.strip()
+        if not line or line.startswith("//"):
+            continue
+        lines.append(_JS_TRAILING_COMMENT_RE.sub("", line))
+    return "\n".join(lines)
+
+
+# What actually ships: the init script runs in every document of every WebMCP
+# session, so it's minified once here (about 40% smaller) rather than sending
+# the commented source each time.
+_WEBMCP_INIT_SCRIPT_MIN = _minify_js(WEBMCP_INIT_SCRIPT)
+
+
 async def _inject_webmcp_script(context: Any) -> None:
     """Inject the WebMCP interceptor init script into a browser context."""
-    await context.add_init_script(WEBMCP_INIT_SCRIPT)
+    await context.add_init_script(_WEBMCP_INIT_SCRIPT_MIN)
 
 
 def _build_chrome_launch_opts() -> dict[str, Any]:
@@ -393,10 +471,10 @@ def _build_chrome_launch_opts() -> dict[str, Any]:
 async def _block_trackers(context: Any) -> None:
     """Set up route interception to block tracker/analytics/fingerprinter scripts.
 
-    Uses Playwright's context.route() with glob patterns to abort matching requests.
+    One context.route() with the precompiled _TRACKER_RE aborts matching requests —
+    each request is tested against a single regex instead of one route per pattern.
     """
-    for pattern in TRACKER_PATTERNS:
-        await context.route(pattern, lambda route: route.abort())
+    await context.route(_TRACKER_RE, lambda route: route.abort())
 
 
 # ---------------------------------------------------------------------------
@@ -595,6 +673,82 @@ class BrowserTier(abc.ABC):
         ...
 
 
+def _has_module(name: str) -> bool:
+    """Whether a tier's package is installed, without importing it.
+
+    detect() only needs presence — find_spec avoids executing e.g. camoufox's
+    package init when probing tiers that may never be launched.
+    """
+    return importlib.util.find_spec(name) is not None
+
+
+# Tier 1 browser sharing (Config.SHARE_BROWSER). One Chromium serves every Tier 1
+# session, each in its own context. The browser closes when the last of its
+# contexts is torn down, so an idle server still holds no browser for the orphan
+# reaper to find; a crashed browser is replaced on the next launch.
+_T1_POOL: dict[str, Any] = {
+    "pw": None,
+    "browser": None,
+    "contexts": set(),
+    "lock": asyncio.Lock(),
+}
+
+
+async def _close_t1_pool() -> None:
+    pool = _T1_POOL
+    browser, pw = pool["browser"], pool["pw"]
+    pool["browser"] = pool["pw"] = None
+    pool["contexts"] = set()
+    if browser is not None:
+        try:
+            await browser.close()
+        except Exception:
+            pass
+    if pw is not None:
+        try:
+            await pw.stop()
+        except Exception:
+            pass
+
+
+async def _t1_pool_new_context(
+    start_playwright: Any, launch_opts: dict[str, Any], context_opts: dict[str, Any],
+) -> tuple[Any, Any]:
+    """Open a context on the shared Tier 1 browser, launching it if needed."""
+    pool = _T1_POOL
+    async with pool["lock"]:
+        browser = pool["browser"]
+        if browser is None or not browser.is_connected():
+            await _close_t1_pool()
+            pw = await start_playwright().start()
+            try:
+                browser = await pw.chromium.launch(**launch_opts)
+            except Exception:
+                await pw.stop()
+                raise
+            pool["pw"], pool["browser"] = pw, browser
+        try:
+            context = await browser.new_context(**context_opts)
+        except Exception:
+            if not pool["contexts"]:
+                await _close_t1_pool()
+            raise
+        pool["contexts"].add(context)
+        return browser, context
+
+
+async def _t1_pool_release(context: Any) -> None:
+    pool = _T1_POOL
+    async with pool["lock"]:
+        pool["contexts"].discard(context)
+        try:
+            await context.close()
+        except Exception:
+            pass
+        if not pool["contexts"]:
+            await _close_t1_pool()
+
+
 class Tier1Playwright(BrowserTier):
     """Vanilla Playwright Chromium — no stealth, fastest startup."""
 
@@ -607,11 +761,7 @@ class Tier1Playwright(BrowserTier):
         return "playwright"
 
     async def detect(self) -> bool:
-        try:
-            import playwright  # noqa: F401
-            return True
-        except ImportError:
-            return False
+        return _has_module("playwright")
 
     async def init(
         self,
@@ -623,11 +773,8 @@ class Tier1Playwright(BrowserTier):
         from playwright.async_api import async_playwright
 
         geo = get_geo_config()
-        pw = await async_playwright().start()
-
         launch_opts: dict[str, Any] = {"headless": Config.HEADLESS}
         launch_opts.update(_build_chrome_launch_opts())
-        browser = await pw.chromium.launch(**launch_opts)
 
         context_opts: dict[str, Any] = {
             "viewport": viewport or Config.DEFAULT_VIEWPORT,
@@ -663,7 +810,17 @@ class Tier1Playwright(BrowserTier):
                     "country. Set BROWSER_USE_GEO to match, or use Tier 2/3 for GeoIP."
                 )
 
-        context = await browser.new_context(**context_opts)
+        if Config.SHARE_BROWSER:
+            # The pool owns the Playwright driver, so the session's handle is its
+            # own context — teardown closes that and leaves the browser to the pool.
+            browser, context = await _t1_pool_new_context(
+                async_playwright, launch_opts, context_opts,
+            )
+            pw = context
+        else:
+            pw = await async_playwright().start()
+            browser = await pw.chromium.launch(**launch_opts)
+            context = await browser.new_context(**context_opts)
 
         # Inject WebMCP interceptor when enabled
         if Config.WEBMCP_ENABLED != "0":
@@ -672,6 +829,9 @@ class Tier1Playwright(BrowserTier):
         return pw, browser, context
 
     async def teardown(self, handle: Any, browser: Any) -> None:
+        if handle in _T1_POOL["contexts"]:
+            await _t1_pool_release(handle)
+            return
         try:
             await browser.close()
         except Exception:
@@ -700,11 +860,7 @@ class Tier2Patchright(BrowserTier):
         return "patchright"
 
     async def detect(self) -> bool:
-        try:
-            import patchright  # noqa: F401
-            return True
-        except ImportError:
-            return False
+        return _has_module("patchright")
 
     async def init(
         self,
@@ -885,11 +1041,7 @@ class Tier3Camoufox(BrowserTier):
         return "camoufox"
 
     async def detect(self) -> bool:
-        try:
-            import camoufox  # noqa: F401
-            return True
-        except ImportError:
-            return False
+        return _has_module("camoufox")
 
     async def init(
         self,
@@ -1006,15 +1158,21 @@ def _session_file(session_id: str) -> Path:
 
 
 def _save_session_meta(session_id: str, meta: dict) -> None:
-    """Persist minimal session metadata to disk for cross-invocation access."""
+    """Persist minimal session metadata to disk for cross-invocation access.
+
+    Written to a sibling temp file and renamed into place, so a concurrent
+    reader sees either the previous file or the complete new one.
+    """
     path = _session_file(session_id)
-    path.write_text(json.dumps(meta, indent=2))
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(jsonio.dumpb(meta))
+    os.replace(tmp, path)
 
 
 def _load_session_meta(session_id: str) -> dict | None:
     path = _session_file(session_id)
     if path.exists():
-        return json.loads(path.read_text())
+        return jsonio.loads(path.read_bytes())
     return None
 
 
@@ -1096,7 +1254,6 @@ def _setup_download_handler(context, session_data: dict, session_id: str) -> Non
     Downloads are auto-saved to a session-scoped temp directory.
     File metadata is tracked in session_data["downloads"].
     """
-    import os
     import tempfile
 
     download_dir = os.path.join(tempfile.gettempdir(), "browser-use-downloads", session_id)
@@ -1110,7 +1267,10 @@ def _setup_download_handler(context, session_data: dict, session_id: str) -> Non
             filename = download.suggested_filename
             save_path = os.path.join(download_dir, filename)
             await download.save_as(save_path)
-            size = os.path.getsize(save_path) if os.path.exists(save_path) else 0
+            try:
+                size = os.path.getsize(save_path)  # one stat; no exists() pre-check race
+            except OSError:
+                size = 0
             downloads_list.append({
                 "filename": filename,
                 "path": save_path,
@@ -1173,7 +1333,7 @@ async def launch(
     """
     global _last_launch_at
     _last_launch_at = time.monotonic()
-    session_id = uuid.uuid4().hex[:12]
+    session_id = os.urandom(6).hex()
 
     # Resolve profile path (with traversal protection)
     profile_path = None
@@ -1241,6 +1401,7 @@ async def launch(
             "download_dir": _event_data.get("download_dir"),
             "console_logs": _event_data.get("console_logs", []),
             "loop_detector": ActionLoopDetector(),
+            "rng": random.Random(),  # per-session humanization/fingerprint randomness
         }
     finally:
         _launches_in_flight -= 1
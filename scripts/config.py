@@ -157,10 +157,21 @@ class Config:
     # Grace window after a launch starts during which the orphan reaper stays its
     # hand — covers the gap between spawning a browser and registering its session.
     LAUNCH_REAP_GRACE_SEC = int(os.getenv("BROWSER_USE_LAUNCH_REAP_GRACE_SEC", "30"))
+    # Tier 1 only: share one Chromium across sessions, one context each, instead of a
+    # browser process per launch. Off by default — a browser crash then takes down every
+    # Tier 1 session at once. Stealth tiers always launch their own browser.
+    SHARE_BROWSER = os.getenv("BROWSER_USE_SHARE_BROWSER", "0") == "1"
 
     # Evaluate gating
     EVALUATE_ENABLED = os.getenv("BROWSER_USE_EVALUATE", "1") == "1"
 
+    # Skip Playwright's per-API-call inspect.stack() walk (see actions._disable_api_stack_capture).
+    # Off by default: with it on, Playwright error messages lose their "Locator.click:" prefix
+    # and traces lose call-site frames. Worth it when many sessions share one event loop.
+    # PW_INSPECT_STACK=0 is accepted as an alias (the name used in upstream discussions).
+    FAST_API_CALLS = (os.getenv("BROWSER_USE_FAST", "0") == "1"
+                      or os.getenv("PW_INSPECT_STACK", "1") == "0")
+
     # Humanization — global default (can be overridden per-launch)
     HUMANIZE_ACTIONS = os.getenv("BROWSER_USE_HUMANIZE", "0") == "1"
 
@@ -354,23 +354,33 @@ def recommendation_for_protection(protection: Optional[str], url: Optional[str]
     }
 
 
-async def _detect_block_protection(page) -> Optional[str]:
+async def _detect_block_protection(page, title: Optional[str] = None) -> Optional[str]:
     """Detect a block/challenge from the live page (title/url + small body sample).
 
     Returns the protection type string if blocked, None if OK. Browser-page only —
-    no out-of-browser network probe.
+    no out-of-browser network probe. Pass `title` when the caller already fetched
+    it for the page's current URL to skip a page.title() round-trip.
     """
     try:
-        title = (await page.title()).lower()
-        url = page.url.lower()
-
-        # Body sample (once) — used for the UAM and captcha checks below.
+        # Body sample (once) — used for the UAM and captcha checks below. When the
+        # title is unknown it rides along in the same evaluate instead of costing
+        # a separate page.title() round-trip.
         try:
-            content = (await page.evaluate(
-                "document.body ? document.body.innerText.substring(0, 500) : ''"
-            ) or "").lower()
+            if title is None:
+                title, content = await page.evaluate(
+                    "[document.title, document.body ? document.body.innerText.substring(0, 500) : '']"
+                )
+            else:
+                content = await page.evaluate(
+                    "document.body ? document.body.innerText.substring(0, 500) : ''"
+                )
+            content = (content or "").lower()
         except Exception:
             content = ""
+        if title is None:
+            title = await page.title()
+        title = (title or "").lower()
+        url = page.url.lower()
 
         # Cloudflare under-attack / interstitial → Tier 3 (more severe than a plain
         # challenge). Matched on UAM-SPECIFIC markers so a plain "Just a moment"
@@ -414,7 +424,7 @@ async def is_blocked(page) -> Optional[str]:
     return await _detect_block_protection(page)
 
 
-async def assess_block(page) -> Optional[dict]:
+async def assess_block(page, title: Optional[str] = None) -> Optional[dict]:
     """Detect a block AND attach an escalation recommendation.
 
     Returns None if the page is not blocked. Otherwise:
@@ -423,9 +433,10 @@ async def assess_block(page) -> Optional[dict]:
     Uses the live page (title/url/body) plus the pure protection→recommendation
     map. Deliberately NO httpx probe: an out-of-browser request would not share
     the session's cookies/proxy/fingerprint and could disagree with what the
-    browser actually sees.
+    browser actually sees. `title` is an optional already-known page title (see
+    _detect_block_protection).
     """
-    protection = await _detect_block_protection(page)
+    protection = await _detect_block_protection(page, title=title)
     if not protection:
         return None
     try:
@@ -8,6 +8,7 @@ Ported patterns:
 
 from __future__ import annotations
 
+import functools
 import re
 import time
 from dataclasses import dataclass, field
@@ -267,12 +268,20 @@ def classify_error(
 ) -> BrowserError:
     """Classify a Playwright/browser exception into a structured BrowserError."""
     msg = _scrub_credentials(str(error))
+    lowered = msg.lower()
     for pattern, code, msg_fn in _PATTERN_MAP:
-        if pattern.lower() in msg.lower():
+        if pattern.lower() in lowered:
             return create_error(code, msg_fn(error), at_state=at_state, cause=error)
     return create_error("UNKNOWN", f"Browser error: {msg}", at_state=at_state, cause=error)
 
 
+@functools.lru_cache(maxsize=256)
+def _friendly_message(raw: str) -> str:
+    # Classification depends only on the message text, so flaky pages that raise
+    # the same timeout/detached error over and over hit the cache.
+    return classify_error(Exception(raw)).to_agent_message()
+
+
 def to_ai_friendly_error(error: Exception) -> str:
     """Legacy wrapper — returns a plain string for backward compatibility."""
-    return classify_error(error).to_agent_message()
+    return _friendly_message(str(error))
@@ -0,0 +1,142 @@
+"""JSON encode/decode with optional orjson acceleration.
+
+orjson is optional — without it every helper falls back to the stdlib json
+module with identical call semantics. Both paths emit raw UTF-8 rather than
+\\u escapes (ensure_ascii=False), so a string's serialized size tracks its
+length the same way either way — the response truncators rely on that. Output
+may still differ cosmetically (orjson has no spaces after separators in
+compact mode); both parse back to the same value.
+
+A lone UTF-16 surrogate (JS .slice() splitting an emoji pair) can't be written
+as UTF-8: orjson rejects it and the stdlib fallback emits it as the JSON escape
+\\ud83d — the same bytes ensure_ascii=True would give, for that character only.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson  # optional — 2-5x faster dumps/loads on large payloads
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def _surrogate_safe(text: str) -> bytes:
+    """UTF-8 bytes of stdlib JSON text, lone surrogates written as \\uXXXX escapes.
+
+    Surrogates can only occur inside JSON strings, where backslashreplace's
+    \\udXXX form is exactly the JSON escape. Only the failing case pays the
+    second encode.
+    """
+    try:
+        return text.encode()
+    except UnicodeEncodeError:
+        return text.encode("utf-8", "backslashreplace")
+
+
+def dumps(obj: Any, *, indent: bool = False, default: Callable[[Any], Any] | None = None) -> str:
+    """Serialize to a JSON string. `indent=True` pretty-prints with 2 spaces.
+
+    Falls back to stdlib json for values orjson rejects (ints beyond 64 bits,
+    exotic key types), so callers never see an orjson-specific error.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode()
+        except TypeError:
+            pass
+    text = json.dumps(obj, indent=2 if indent else None, default=default, ensure_ascii=False)
+    return text if text.isascii() else _surrogate_safe(text).decode()
+
+
+def dumps_capped(
+    obj: Any,
+    limit: int,
+    *,
+    indent: bool = False,
+    default: Callable[[Any], Any] | None = None,
+) -> tuple[str, bool]:
+    """Serialize like dumps(), keeping at most `limit` characters.
+
+    Returns (text, truncated). The stdlib path streams through iterencode and
+    stops once past the limit, so a multi-MB value is never built in full just
+    to be cut. orjson is fast enough that it serializes everything and slices.
+    """
+    if orjson is not None:
+        text = dumps(obj, indent=indent, default=default)
+        return (text[:limit], True) if len(text) > limit else (text, False)
+    parts: list[str] = []
+    size = 0
+    encoder = json.JSONEncoder(indent=2 if indent else None, default=default, ensure_ascii=False)
+    for chunk in encoder.iterencode(obj):
+        parts.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            text = "".join(parts)
+            return (text if text.isascii() else _surrogate_safe(text).decode())[:limit], True
+    text = "".join(parts)
+    return (text if text.isascii() else _surrogate_safe(text).decode()), False
+
+
+def dumpb(obj: Any, *, default: Callable[[Any], Any] | None = None) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, for writing straight to a binary stream."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return _surrogate_safe(json.dumps(obj, default=default, ensure_ascii=False))
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON from str or bytes. Raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def truncate_result(result: dict, original_bytes: int, max_bytes: int) -> dict:
+    """Cut an oversized result's largest string fields until it fits `max_bytes`.
+
+    Preserves success/error semantics (those keys are never cut) rather than
+    replacing the result, and adds truncation metadata. `original_bytes` is the
+    dumpb size of the whole result. A string value's share of that is exactly
+    dumpb(value), so only the field being cut is re-encoded, never the whole
+    (possibly multi-MB) result once per field.
+    """
+    # Ranked and cut in UTF-8 bytes — what a field occupies in the dumpb output —
+    # so a CJK-heavy field (3 bytes/char) is neither under-weighted nor over-cut.
+    # surrogatepass: a lone surrogate (3 bytes here) mustn't make sizing raise.
+    trunc_candidates = []
+    for key, val in result.items():
+        if isinstance(val, str) and key not in ("success", "error"):
+            trunc_candidates.append((key, val.encode("utf-8", "surrogatepass")))
+    trunc_candidates.sort(key=lambda x: len(x[1]), reverse=True)
+
+    out = dict(result)
+    truncated_fields = []
+    size = original_bytes
+    for key, raw in trunc_candidates:
+        if size <= max_bytes:
+            break
+        field_val = out[key]
+        # Raw bytes never exceed the field's serialized bytes (escapes only add),
+        # so dropping `overshoot` raw bytes drops at least that much output.
+        cut = max(0, len(raw) - (size - max_bytes) - 200)  # extra margin for metadata
+        while cut and (raw[cut] & 0xC0) == 0x80:  # back off to a character boundary
+            cut -= 1
+        new_val = (raw[:cut].decode("utf-8", "surrogatepass")
+                   + f"... [truncated from {len(field_val)} chars]")
+        size += len(dumpb(new_val)) - len(dumpb(field_val))
+        out[key] = new_val
+        truncated_fields.append(key)
+
+    out["truncated"] = True
+    out["truncated_fields"] = truncated_fields
+    out["original_bytes"] = original_bytes
+    return out
@@ -158,10 +158,12 @@ class CompactionSettings(BaseModel):
 class FSMState(BaseModel):
     """Lightweight snapshot of agent FSM state for status reporting."""
     name: AgentStateName
-    since_ms: int
+    since_ms: int  # monotonic clock (ms) — compare against itself, not wall time
     deadline_ms: int | None = None
     epoch: int = 0
 
+    model_config = {"frozen": True}
+
 
 # ---------------------------------------------------------------------------
 # Loop detection (ported from browser-use ActionLoopDetector pattern)
@@ -25,6 +25,7 @@ from http import HTTPStatus
 # Ensure scripts/ is on path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import jsonio
 from config import Config
 
 # Import aiohttp for lightweight server
@@ -89,6 +90,26 @@ async def _with_session_lock(session_id: str, coro_fn):
         return await coro_fn()
 
 
+# Read-only actions that never count towards action-loop detection.
+_LOOP_SKIP_ACTIONS = frozenset({
+    "snapshot", "screenshot", "done", "wait", "search_page",
+    "find_elements", "extract", "get_downloads",
+})
+
+
+def _known_title(result: dict, page, url_key: str, title_key: str) -> str | None:
+    """Title the action/launch already fetched, if it still describes `page`.
+
+    Reused by block detection to skip a second page.title() round-trip. Only
+    trusted when the recorded URL matches the page's current URL (a tab switch
+    or late redirect means the title is stale → None, detection refetches).
+    """
+    title = result.get(title_key)
+    if title and result.get(url_key) == page.url:
+        return title
+    return None
+
+
 async def handle_request_inner(request_data: dict) -> dict:
     """Route request to handler (same logic as agent.py)."""
     op = request_data.get("op", "")
@@ -110,7 +131,8 @@ async def handle_request_inner(request_data: dict) -> dict:
                 sid = result.get("session_id")
                 active_page = await browser_engine.get_page(sid) if sid else None
                 if active_page:
-                    assessment = await assess_block(active_page)
+                    assessment = await assess_block(
+                        active_page, title=_known_title(result, active_page, "url", "title"))
                     if assessment:
                         result["blocked"] = True
                         result["protection"] = assessment["protection"]
@@ -183,6 +205,12 @@ async def handle_request_inner(request_data: dict) -> dict:
                 "tier_name": session_data.get("tier_name", ""),
                 "humanize": session_data.get("humanize", False),
                 "humanize_intensity": humanize_intensity,
+                "_hb_cache": session_data.setdefault("_hb_cache", {}),
+                "_frame_cache": session_data.setdefault("_frame_cache", {}),
+                "_locator_cache": session_data.setdefault("_locator_cache", {}),
+                "_cookies_cache": session_data.setdefault("_cookies_cache", {}),
+                "_ref_index": session_data.setdefault("_ref_index", {}),
+                "rng": session_data.get("rng"),
                 "webmcp_available": session_data.get("webmcp_available"),
                 "webmcp_tools": session_data.get("webmcp_tools", {}),
                 "downloads": session_data.get("downloads", []),
@@ -201,10 +229,8 @@ async def handle_request_inner(request_data: dict) -> dict:
             session_data["action_count"] = session_data.get("action_count", 0) + 1
 
             # Loop detection (skip read-only actions)
-            _loop_skip = {"snapshot", "screenshot", "done", "wait", "search_page",
-                          "find_elements", "extract", "get_downloads"}
             loop_detector = session_data.get("loop_detector")
-            if loop_detector and action_name not in _loop_skip:
+            if loop_detector and action_name not in _LOOP_SKIP_ACTIONS:
                 from models import PageFingerprint
                 fingerprint = None
                 current_refs = session_ctx.get("ref_map") or browser_engine.get_session_ref_map(session_id)
@@ -250,7 +276,10 @@ async def handle_request_inner(request_data: dict) -> dict:
                     from detection import assess_block
                     active_page = await browser_engine.get_page(session_id)
                     if active_page:
-                        assessment = await assess_block(active_page)
+                        assessment = await assess_block(
+                            active_page,
+                            title=_known_title(result, active_page, "new_url", "new_title"),
+                        )
                         if assessment:
                             protection = assessment["protection"]
                             result["blocked"] = True
@@ -393,7 +422,6 @@ async def handle_request_inner(request_data: dict) -> dict:
 
     elif op == "screenshot":
         import browser_engine
-        import base64
 
         session_id = request_data.get("session_id")
         if not session_id:
@@ -404,50 +432,37 @@ async def handle_request_inner(request_data: dict) -> dict:
             if page is None:
                 return {"success": False, "error": f"Session {session_id} not found or expired"}
 
-            import asyncio as _aio
-            from actions import _firefox_screenshot_fallback
-            full_page = request_data.get("full_page", False)
+            from actions import _b64encode, _capture_screenshot, _screenshot_format
 
-            # Tier 1: Playwright native
-            data = None
-            try:
-                data = await page.screenshot(full_page=full_page, type="png", timeout=15000)
-            except Exception:
-                pass
-
-            # Tier 2: CDP with optimizeForSpeed
-            if data is None:
-                try:
-                    async def _cdp_shot():
-                        context = page.context
-                        cdp = await context.new_cdp_session(page)
-                        try:
-                            await cdp.send("Emulation.setFocusEmulationEnabled", {"enabled": False})
-                        except Exception:
-                            pass
-                        cdp_params = {"format": "png", "optimizeForSpeed": True}
-                        if full_page:
-                            cdp_params["captureBeyondViewport"] = True
-                        result = await cdp.send("Page.captureScreenshot", cdp_params)
-                        await cdp.detach()
-                        return base64.b64decode(result["data"])
-                    data = await _aio.wait_for(_cdp_shot(), timeout=10.0)
-                except Exception:
-                    pass
-
-            # Tier 3: Firefox fallback (skip if session is already Firefox)
-            if data is None:
-                session_data = browser_engine._sessions.get(session_id, {})
-                tier = session_data.get("tier", 1)
-                if tier in (1, 2):
-                    data = await _firefox_screenshot_fallback(page.url, full_page)
+            fmt = _screenshot_format(request_data)
+            if isinstance(fmt, str):
+                return {"success": False, "error": fmt}
+            image_type, quality = fmt
 
+            session_data = browser_engine._sessions.get(session_id, {})
+            data = await _capture_screenshot(
+                page,
+                session_data.get("tier", 1),
+                request_data.get("full_page", False),
+                image_type,
+                quality,
+            )
             if data is None:
                 return {"success": False, "error": "Screenshot failed: Playwright, CDP, and Firefox fallback all timed out"}
 
+            # encoding="binary": handle_http answers with the raw image body instead
+            # of JSON — no base64 inflation, and no JSON size cap mangling the image.
+            if request_data.get("encoding") == "binary":
+                return {
+                    "success": True,
+                    "screenshot_bytes": data,
+                    "content_type": f"image/{image_type}",
+                    "size": len(data),
+                }
             return {
                 "success": True,
-                "screenshot": base64.b64encode(data).decode("ascii"),
+                "screenshot": await _b64encode(data),
+                "type": image_type,
                 "size": len(data),
             }
 
@@ -528,38 +543,8 @@ async def handle_request_inner(request_data: dict) -> dict:
 
 
 def _truncate_result(result: dict, original_bytes: int) -> dict:
-    """Truncate oversized result while preserving success/error semantics.
-
-    Instead of replacing the entire result with a new success=True dict,
-    truncate the largest string fields and add truncation metadata.
-    """
-    max_bytes = Config.MAX_SNAPSHOT_BYTES
-    truncated_fields = []
-
-    # Identify string fields that can be truncated, sorted by size descending
-    trunc_candidates = []
-    for key, val in result.items():
-        if isinstance(val, str) and key not in ("success", "error"):
-            trunc_candidates.append((key, len(val)))
-    trunc_candidates.sort(key=lambda x: x[1], reverse=True)
-
-    # Truncate largest fields until output fits
-    out = dict(result)
-    for key, size in trunc_candidates:
-        serialized = json.dumps(out, default=str)
-        if len(serialized) <= max_bytes:
-            break
-        # Estimate how much to cut from this field
-        overshoot = len(serialized) - max_bytes
-        field_val = out[key]
-        new_len = max(0, len(field_val) - overshoot - 200)  # extra margin for metadata
-        out[key] = field_val[:new_len] + f"... [truncated from {len(field_val)} chars]"
-        truncated_fields.append(key)
-
-    out["truncated"] = True
-    out["truncated_fields"] = truncated_fields
-    out["original_bytes"] = original_bytes
-    return out
+    """Truncate an oversized result to Config.MAX_SNAPSHOT_BYTES (see jsonio.truncate_result)."""
+    return jsonio.truncate_result(result, original_bytes, Config.MAX_SNAPSHOT_BYTES)
 
 
 async def handle_http(request: web.Request) -> web.Response:
@@ -583,12 +568,22 @@ async def handle_http(request: web.Request) -> web.Response:
     except Exception as e:
         result = {"success": False, "error": f"Unhandled error: {e}"}
 
-    # Truncate oversized responses
-    output = json.dumps(result, default=str)
+    # Binary screenshot: raw image body; size travels in a header.
+    if isinstance(result.get("screenshot_bytes"), bytes):
+        return web.Response(
+            body=result["screenshot_bytes"],
+            content_type=result.get("content_type", "image/png"),
+            headers={"X-Screenshot-Size": str(result.get("size", 0))},
+        )
+
+    # Truncate oversized responses. The bytes measured here are the bytes sent —
+    # serialized once straight to UTF-8, never decoded to str and re-encoded (for
+    # a base64 screenshot or a large snapshot each pass was a full extra copy).
+    output = jsonio.dumpb(result, default=str)
     if len(output) > Config.MAX_SNAPSHOT_BYTES:
         result = _truncate_result(result, len(output))
         # Re-check after truncation — nested data (refs, etc.) may keep it over limit
-        output = json.dumps(result, default=str)
+        output = jsonio.dumpb(result, default=str)
         if len(output) > Config.MAX_SNAPSHOT_BYTES:
             result = {
                 "success": result.get("success", False),
@@ -598,8 +593,9 @@ async def handle_http(request: web.Request) -> web.Response:
                 "message": "Response exceeded size limit even after field truncation. "
                            "Use a more targeted request to reduce output size.",
             }
+            output = jsonio.dumpb(result, default=str)
 
-    return web.json_response(result)
+    return web.Response(body=output, content_type="application/json")
 
 
 async def handle_health(request: web.Request) -> web.Response:
@@ -660,6 +656,11 @@ async def on_startup(app: web.Application) -> None:
     """Start background tasks on server startup."""
     app["sweeper_task"] = asyncio.create_task(_session_sweeper(app))
 
+    # Import actions up front: with BROWSER_USE_FAST=1 its import patches the
+    # driver's per-call stack capture, which should already be off for the
+    # first launch/navigation, not only from the first action onwards.
+    import actions  # noqa: F401
+
     # Prewarm CloakBrowser binary (non-blocking, logs status)
     import browser_engine
     asyncio.create_task(browser_engine.prewarm_cloakbrowser())
@@ -684,6 +685,9 @@ async def cleanup(app: web.Application) -> None:
         except Exception:
             pass
 
+    import actions
+    await actions.close_firefox_pool()
+
 
 def main():
     parser = argparse.ArgumentParser(description="browser-use HTTP server")
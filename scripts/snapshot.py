@@ -91,6 +91,9 @@ _LINE_PATTERN = re.compile(
 
 _ATTR_PATTERN = re.compile(r'\[(\w+)=(\w+)\]')
 
+# Exact @eN token (not a prefix of @e10) — used by paginate_tree.
+_REF_TOKEN_PATTERN = re.compile(r"(?<!\w)@e\d+(?!\d)")
+
 # ---------------------------------------------------------------------------
 # Ref counter (per-call, not global — avoids race across concurrent snapshots)
 # ---------------------------------------------------------------------------
@@ -513,7 +516,7 @@ def paginate_tree(result: dict, *, offset: int = 0, max_chars: int = 0,
 
     # Exact @eN tokens in the window (substring `k in text` would treat @e1 as visible
     # whenever @e10/@e11 appears — a false positive).
-    visible_keys = set(re.findall(r"(?<!\w)@e\d+(?!\d)", windowed_text))
+    visible_keys = set(_REF_TOKEN_PATTERN.findall(windowed_text))
     full_refs = result.get("refs", {})
     visible_refs = {k: v for k, v in full_refs.items() if k in visible_keys}
 
@@ -0,0 +1,45 @@
+"""Unit tests for AgentFSM epoch tracking — pure, no browser.
+
+Run: python scripts/test_agent_fsm.py   (exit 0 = all pass)
+"""
+
+import sys
+
+from agent_fsm import AgentFSM
+from models import AgentStateName
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+# ---------------------------------------------------------------------------
+# accept(): work captured under an epoch is current until the next bump
+# ---------------------------------------------------------------------------
+
+fsm = AgentFSM()
+old = fsm.epoch
+check("fresh epoch is accepted", fsm.accept(old) is True)
+
+seen = []
+fsm.subscribe(lambda new, prev: seen.append((prev.epoch, new.epoch)))
+new = fsm.bump_epoch()
+check("bump_epoch returns the new epoch", new == old + 1 and fsm.epoch == new)
+check("stale epoch is rejected after bump", fsm.accept(old) is False)
+check("new epoch is accepted after bump", fsm.accept(new) is True)
+check("bump keeps the state name", fsm.state_name is AgentStateName.IDLE)
+check("bump notifies listeners", seen == [(old, new)])
+
+fsm.bump_epoch()
+check("earlier epoch rejected after a second bump", fsm.accept(new) is False)
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
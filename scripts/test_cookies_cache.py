@@ -0,0 +1,69 @@
+"""Unit tests for the per-session cookies_get TTL cache.
+
+Pure — no browser. A fake context counts cookie reads; actions go through
+execute_action so the "any other action drops the cache" rule is exercised.
+
+Run: python scripts/test_cookies_cache.py   (exit 0 = all pass)
+"""
+
+import asyncio
+import sys
+
+import actions
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+# --- cookies_get cache: served within TTL, dropped by any other action -----
+class CookieContext:
+    def __init__(self):
+        self.reads = 0
+
+    async def cookies(self, urls=None):
+        self.reads += 1
+        return [{"name": "sid", "value": str(self.reads)}]
+
+    async def add_cookies(self, cookies):
+        pass
+
+
+class CookiePage:
+    url = "https://example.com/"
+
+    def __init__(self):
+        self.context = CookieContext()
+
+
+cpage = CookiePage()
+sess = {"ref_map": {}}
+
+
+def ex(name, params):
+    return asyncio.run(actions.execute_action(cpage, name, params, sess))
+
+
+r1 = ex("cookies_get", {})
+r2 = ex("cookies_get", {})
+check("cookies cached within TTL", cpage.context.reads == 1
+      and r1["extracted_content"] == r2["extracted_content"])
+ex("cookies_get", {"domain": "other.com"})
+check("cookies cache keyed on domain", cpage.context.reads == 2)
+ex("cookies_set", {"cookies": [{"name": "a", "value": "b", "url": cpage.url}]})
+ex("cookies_get", {"domain": "other.com"})
+check("cookies cache dropped by other action", cpage.context.reads == 3)
+sess["_cookies_cache"]["ts"] -= actions._COOKIES_TTL
+ex("cookies_get", {"domain": "other.com"})
+check("cookies cache expires", cpage.context.reads == 4)
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
@@ -80,7 +80,10 @@ class FakePage:
         self._title, self.url, self._body = title, url, body
     async def title(self):
         return self._title
-    async def evaluate(self, _js):
+    async def evaluate(self, js):
+        # Title unknown → detection batches it with the body sample.
+        if js.startswith("[document.title"):
+            return [self._title, self._body]
         return self._body
 
 async def _page_tests():
@@ -122,6 +125,15 @@ async def _page_tests():
     chk("assess_block(clean) → None", await d.assess_block(clean) is None)
     chk("is_blocked(clean) → None", await d.is_blocked(clean) is None)
 
+    # known title is used as-is — no page.title() round-trip
+    class NoTitlePage(FakePage):
+        async def title(self):
+            raise AssertionError("page.title() should not be called")
+    nt = NoTitlePage(url="https://shop.test/")
+    a4 = await d.assess_block(nt, title="Just a moment...")
+    chk("assess_block(title=...) skips page.title()", a4 and a4["protection"] == "cloudflare", f"{a4}")
+    chk("assess_block(title=clean) → None", await d.assess_block(nt, title="Welcome") is None)
+
 asyncio.run(_page_tests())
 
 print(f"\n{_PASS} passed, {_FAIL} failed")
@@ -0,0 +1,42 @@
+"""Unit tests for find_elements' per-snapshot ref index and row memo.
+
+Pure — no browser. find_elements reads only the session's ref_map, so it runs
+with no page at all.
+
+Run: python scripts/test_find_elements.py   (exit 0 = all pass)
+"""
+
+import asyncio
+import sys
+
+import actions
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+# --- find_elements index: built once per ref_map object ---------------------
+sess = {"ref_map": {
+    "@e1": {"role": "button", "name": "Go", "selector": "", "nth": 1},
+    "@e2": {"role": "clickable", "name": "x", "selector": "div.card"},
+}}
+idx1 = actions._ref_index(sess, sess["ref_map"])
+check("ref index reused for same map", actions._ref_index(sess, sess["ref_map"])[0] is idx1[0])
+sess["ref_map"] = {"@e7": {"role": "Link", "name": "Docs"}}
+by_role, names = actions._ref_index(sess, sess["ref_map"])
+check("ref index rebuilt on new map", by_role == {"link": ["@e7"]} and names == {"@e7": "docs"})
+r = asyncio.run(actions.action_find_elements(None, {"role": "link"}, sess))
+check("find_elements row formatted", r["extracted_content"].endswith('@e7 (Link) "Docs"'))
+check("find_elements row memoized", sess["_ref_index"]["rows"] == {"@e7": '  @e7 (Link) "Docs"'})
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
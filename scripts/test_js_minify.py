@@ -0,0 +1,91 @@
+"""Unit tests for browser_engine._minify_js — pure, no browser.
+
+The minifier is line-based and regex-driven, so these pin down what it must
+never touch (`//` inside strings and URLs) alongside what it must drop. The
+shipped _WEBMCP_INIT_SCRIPT_MIN is checked line-for-line against its source;
+executing it in a real page is covered by test_webmcp_adapter.py.
+
+Run: python scripts/test_js_minify.py   (exit 0 = all pass)
+"""
+
+import re
+import sys
+
+import browser_engine as be
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+# ---------------------------------------------------------------------------
+# `//` that is not a comment survives
+# ---------------------------------------------------------------------------
+
+keep = [
+    'fetch("https://example.com/api");',
+    "const u = 'http://a.b/c' + path;",
+    'const s = "a // b";',
+    "const t = `x // ${y}`;",
+    "const s2 = ' // quoted at the end';",
+]
+for line in keep:
+    check(f"kept verbatim: {line}", be._minify_js("    " + line) == line)
+
+check("url kept, trailing comment dropped",
+      be._minify_js('const u = "http://a"; // note') == 'const u = "http://a";')
+check("string with // kept, trailing comment dropped",
+      be._minify_js('const s = "a // b"; // c') == 'const s = "a // b";')
+
+# ---------------------------------------------------------------------------
+# Real comments, indentation and blank lines go
+# ---------------------------------------------------------------------------
+
+src = """
+    // leading comment
+    const a = 1;   // trailing comment
+
+        // indented comment
+    if (a) {
+        return a;
+    }
+"""
+check("comments/indent/blanks dropped",
+      be._minify_js(src) == "const a = 1;\nif (a) {\nreturn a;\n}")
+check("newlines kept between statements (ASI unchanged)",
+      be._minify_js("a = 1\nb = 2") == "a = 1\nb = 2")
+
+# ---------------------------------------------------------------------------
+# Shipped init script: every kept line is its source line minus a comment
+# ---------------------------------------------------------------------------
+
+source = [ln.strip() for ln in be.WEBMCP_INIT_SCRIPT.splitlines()]
+source = [ln for ln in source if ln and not ln.startswith("//")]
+minified = be._WEBMCP_INIT_SCRIPT_MIN.splitlines()
+check("init script keeps every code line", len(minified) == len(source))
+check("init script lines match source up to a trailing comment", all(
+    m == s or (s.startswith(m) and re.fullmatch(r"\s+//.*", s[len(m):]))
+    for m, s in zip(minified, source)
+))
+check("init script has no whole-line comments", not any(m.startswith("//") for m in minified))
+check("init script is smaller", len(be._WEBMCP_INIT_SCRIPT_MIN) < len(be.WEBMCP_INIT_SCRIPT))
+
+globals_re = re.compile(r"window\.(\w+)\s*=")
+check("init script defines the same globals",
+      set(globals_re.findall(be._WEBMCP_INIT_SCRIPT_MIN))
+      == set(globals_re.findall(be.WEBMCP_INIT_SCRIPT)) == {"__webmcp"})
+for open_, close in ("()", "[]", "{}"):
+    check(f"init script {open_} balance unchanged",
+          be._WEBMCP_INIT_SCRIPT_MIN.count(open_) - be._WEBMCP_INIT_SCRIPT_MIN.count(close)
+          == be.WEBMCP_INIT_SCRIPT.count(open_) - be.WEBMCP_INIT_SCRIPT.count(close))
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
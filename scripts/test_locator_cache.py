@@ -0,0 +1,69 @@
+"""Unit tests for the per-session ref→locator memo (actions._resolve_ref_cached).
+
+Pure — no browser. A fake page counts locator builds, so reuse and the resets on
+a new snapshot map or a new page are observable.
+
+Run: python scripts/test_locator_cache.py   (exit 0 = all pass)
+"""
+
+import asyncio
+import sys
+
+import actions
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+class FakeLocator:
+    def __init__(self, desc):
+        self.desc = desc
+
+    def nth(self, n):
+        return FakeLocator(self.desc + (("nth", n),))
+
+
+class CountingPage:
+    def __init__(self):
+        self.builds = 0
+
+    def get_by_role(self, role, **kw):
+        self.builds += 1
+        return FakeLocator((("role", role),) + tuple(sorted(kw.items())))
+
+    def locator(self, sel):
+        return FakeLocator((("css", sel),))
+
+
+RMAP = {
+    "@e1": {"role": "button", "name": "Go", "selector": "", "nth": 1},
+    "@e2": {"role": "clickable", "name": "x", "selector": "div.card"},
+}
+
+
+# --- _resolve_ref_cached: memo keyed on (page, ref_map) identity ------------
+cp = CountingPage()
+sess = {"ref_map": dict(RMAP)}
+l1 = asyncio.run(actions._resolve_ref_cached(cp, "@e1", sess))
+l2 = asyncio.run(actions._resolve_ref_cached(cp, "@e1", sess))
+check("memo reuses locator", l1 is l2 and cp.builds == 1)
+sess["ref_map"] = dict(RMAP)  # new snapshot → new map object
+l3 = asyncio.run(actions._resolve_ref_cached(cp, "@e1", sess))
+check("memo reset on new ref_map", l3 is not l1 and cp.builds == 2)
+cp2 = CountingPage()
+asyncio.run(actions._resolve_ref_cached(cp2, "@e1", sess))
+check("memo reset on new page", cp2.builds == 1)
+check("memo skips misses", asyncio.run(actions._resolve_ref_cached(cp2, "@e9", sess)) is None
+      and "@e9" not in sess["_locator_cache"]["locators"])
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
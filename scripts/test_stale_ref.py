@@ -205,6 +205,47 @@ check("non-stale no snapshot_required", "snapshot_required" not in err)
 check("non-stale no refresh", _refresh_calls["n"] == 0)
 
 
+# --- parse_ref spellings ---------------------------------------------------
+check("parse @e1", actions.parse_ref("@e1") == "e1")
+check("parse ref=e12", actions.parse_ref("ref=e12") == "e12")
+check("parse bare e3", actions.parse_ref("e3") == "e3")
+check("parse strips whitespace", actions.parse_ref("  @e7 ") == "e7")
+check("parse rejects non-ref", actions.parse_ref("@foo") is None)
+check("parse rejects bare word", actions.parse_ref("button") is None)
+check("parse rejects trailing junk", actions.parse_ref("@e1x") is None)
+
+
+# --- real _resolve_ref: key spellings hit the same entry -------------------
+class FakeLocator:
+    def __init__(self, desc):
+        self.desc = desc
+
+    def nth(self, n):
+        return FakeLocator(self.desc + (("nth", n),))
+
+
+class FakePage:
+    def get_by_role(self, role, **kw):
+        return FakeLocator((("role", role),) + tuple(sorted(kw.items())))
+
+    def locator(self, sel):
+        return FakeLocator((("css", sel),))
+
+
+RMAP = {
+    "@e1": {"role": "button", "name": "Go", "selector": "", "nth": 1},
+    "@e2": {"role": "clickable", "name": "x", "selector": "div.card"},
+}
+for spelling in ("@e1", "e1", "ref=e1", " @e1 "):
+    loc = asyncio.run(_orig_resolve(FakePage(), spelling, RMAP))
+    check(f"resolve {spelling!r}", loc is not None and loc.desc == (
+        ("role", "button"), ("exact", True), ("name", "Go"), ("nth", 1)))
+loc = asyncio.run(_orig_resolve(FakePage(), "@e2", RMAP))
+check("resolve cursor-interactive via css", loc.desc == (("css", "div.card"),))
+check("resolve missing ref", asyncio.run(_orig_resolve(FakePage(), "@e9", RMAP)) is None)
+check("resolve junk ref", asyncio.run(_orig_resolve(FakePage(), "@foo", RMAP)) is None)
+
+
 actions._resolve_ref = _orig_resolve
 actions.take_snapshot = _orig_snap
 actions._refresh_ref_map = _orig_refresh
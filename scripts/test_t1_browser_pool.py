@@ -0,0 +1,108 @@
+"""Unit tests for the opt-in shared Tier 1 browser pool (BROWSER_USE_SHARE_BROWSER).
+
+Pure — no browser. The pool runs against fake Playwright objects: one launch
+serves many sessions, each with its own context; the browser closes with its
+last context, and a crashed browser is replaced on the next launch.
+
+Run: python scripts/test_t1_browser_pool.py   (exit 0 = all pass)
+"""
+
+import asyncio
+import sys
+
+import browser_engine as be
+from config import Config
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+# ---------------------------------------------------------------------------
+# Shared Tier 1 browser pool — one launch, one context per session, close at zero
+# ---------------------------------------------------------------------------
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **opts):
+        ctx = FakeContext()
+        self.contexts.append(ctx)
+        return ctx
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self, launches):
+        self._launches = launches
+
+    async def launch(self, **opts):
+        b = FakeBrowser()
+        self._launches.append(b)
+        return b
+
+
+class FakePlaywright:
+    def __init__(self, launches):
+        self.chromium = FakeChromium(launches)
+        self.stopped = False
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+async def _pool_scenario():
+    launches = []
+    start = lambda: FakePlaywright(launches)
+    b1, c1 = await be._t1_pool_new_context(start, {}, {})
+    b2, c2 = await be._t1_pool_new_context(start, {}, {})
+    check("pool launches once for two sessions", len(launches) == 1 and b1 is b2)
+    check("pool gives each session its own context", c1 is not c2)
+
+    tier = be.Tier1Playwright()
+    await tier.teardown(c1, b1)
+    check("pool teardown closes only the session context", c1.closed and not b1.closed)
+    await tier.teardown(c2, b2)
+    check("pool closes browser with last context", b1.closed and be._T1_POOL["browser"] is None)
+
+    # crashed shared browser is replaced on the next launch
+    b3, _ = await be._t1_pool_new_context(start, {}, {})
+    b3.connected = False
+    b4, c4 = await be._t1_pool_new_context(start, {}, {})
+    check("pool relaunches after a crash", b4 is not b3 and len(launches) == 3)
+    await tier.teardown(c4, b4)
+    check("pool empty after teardown", not be._T1_POOL["contexts"] and b4.closed)
+
+asyncio.run(_pool_scenario())
+check("share-browser knob present", isinstance(Config.SHARE_BROWSER, bool))
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
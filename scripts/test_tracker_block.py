@@ -0,0 +1,68 @@
+"""Unit tests for tracker blocking: one precompiled regex with Playwright glob semantics.
+
+Pure — no browser. _glob_to_regex and the combined _TRACKER_RE are checked
+against known tracker and ordinary URLs; _block_trackers runs against a fake
+context that records its routes.
+
+Run: python scripts/test_tracker_block.py   (exit 0 = all pass)
+"""
+
+import asyncio
+import re
+import sys
+
+import browser_engine as be
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+check("glob ** prefix may match nothing", be._glob_to_regex("**/a.js") == r"^(?:.*/)?a\.js$")
+check("glob * stays in segment", be._glob_to_regex("**/fp*.js") == r"^(?:.*/)?fp[^/]*\.js$")
+check("glob trailing ** spans", be._glob_to_regex("**/x.com/**") == r"^(?:.*/)?x\.com/.*$")
+
+for url in (
+    "https://www.google-analytics.com/analytics.js",
+    "https://www.googletagmanager.com/gtag/js?id=G-1",
+    "https://s.example/g/collect?v=2",
+    "https://cdn.segment.com/analytics.js/v1/k/analytics.min.js",
+    "https://site.example/_vercel/insights/script.js",
+    "https://static.example/js/fingerprint2.js",
+):
+    check(f"tracker blocked: {url}", be._TRACKER_RE.search(url) is not None)
+
+for url in (
+    "https://example.com/",
+    "https://example.com/app.js",
+    "https://example.com/collection/page/2",   # collect* only as the last segment
+    "https://example.com/analytics.json",
+    "https://o1.ingest.sentry.io/api/1/",      # **/sentry.io/** needs the exact segment
+):
+    check(f"not blocked: {url}", be._TRACKER_RE.search(url) is None)
+
+
+class RouteContext:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, url, handler):
+        self.routes.append(url)
+
+
+rc = RouteContext()
+asyncio.run(be._block_trackers(rc))
+check("trackers: single route registered", len(rc.routes) == 1)
+check("trackers: route is the shared compiled regex", rc.routes[0] is be._TRACKER_RE
+      and isinstance(rc.routes[0], re.Pattern))
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
@@ -0,0 +1,118 @@
+"""Unit tests for the oversized-response truncator (jsonio.truncate_result).
+
+agent.py and server.py both call it through _truncate_result. It tracks the
+response size incrementally — the original byte count plus each cut field's
+change in serialized size — instead of re-serializing the whole result per
+field. These check that bookkeeping
+against a full jsonio.dumpb on fields heavy in escapes (quotes, backslashes,
+newlines, control characters), multibyte text and lone surrogates, under both
+the orjson and the stdlib json back ends. Pure — no browser.
+
+Run: python scripts/test_truncate_result.py   (exit 0 = all pass)
+"""
+
+import json
+import sys
+
+import agent
+import jsonio
+import server
+from config import Config
+
+_PASS = 0
+_FAIL = 0
+
+
+def check(name, cond):
+    global _PASS, _FAIL
+    if cond:
+        _PASS += 1
+    else:
+        _FAIL += 1
+        print(f"FAIL: {name}")
+
+
+_META = ("truncated", "truncated_fields", "original_bytes")
+
+FIELDS = {
+    "quotes": 'say "hi" \\ and "bye" ' * 400,
+    "newlines": "line\r\n\tindented\n" * 500,
+    "control": "\x00\x01\x1f\x7f|" * 600,
+    "cjk": "漢字かな交じり文" * 700,
+    "emoji": "ok 👍🏽 done " * 500,
+    # JS .slice() can split an emoji's surrogate pair — must escape, not raise
+    "surrogate": "snip \ud83d|" * 400,
+}
+
+
+def _payload(**extra):
+    result = {"success": True, "error": None, "page": 3, "refs": ["e1", "e2"]}
+    result.update(FIELDS)
+    result.update(extra)
+    return result
+
+
+def _body_size(out):
+    return len(jsonio.dumpb({k: v for k, v in out.items() if k not in _META}, default=str))
+
+
+def _run(label, truncate):
+    result = _payload()
+    original = len(jsonio.dumpb(result, default=str))
+
+    # Per-field deltas sum to the whole-document delta
+    Config.MAX_SNAPSHOT_BYTES = original // 3
+    out = truncate(result, original)
+    incremental = original + sum(
+        len(jsonio.dumpb(out[k])) - len(jsonio.dumpb(result[k])) for k in out["truncated_fields"]
+    )
+    check(f"{label}: some fields cut", len(out["truncated_fields"]) >= 1)
+    check(f"{label}: incremental size == full re-serialization", incremental == _body_size(out))
+    check(f"{label}: result fits the cap", _body_size(out) <= Config.MAX_SNAPSHOT_BYTES)
+    check(f"{label}: non-string fields untouched",
+          out["page"] == 3 and out["refs"] == ["e1", "e2"] and out["error"] is None)
+
+    # Lone surrogates serialize (as \\uXXXX) instead of raising UnicodeEncodeError
+    lone = {"success": True, "snippet": "ab\ud83d"}
+    check(f"{label}: lone surrogate escaped", b"\\ud83d" in jsonio.dumpb(lone)
+          and json.loads(jsonio.dumpb(lone)) == lone)
+
+    # Exactly one cut is enough → bookkeeping must stop there, not trim more
+    big = "\"\n\\" * 20_000  # every char escapes to 2 bytes
+    result = _payload(big=big)
+    original = len(jsonio.dumpb(result, default=str))
+    Config.MAX_SNAPSHOT_BYTES = original - 10_000
+    out = truncate(result, original)
+    check(f"{label}: stops after the one needed cut", out["truncated_fields"] == ["big"])
+    check(f"{label}: one cut fits the cap", _body_size(out) <= Config.MAX_SNAPSHOT_BYTES)
+
+    # Ranked by UTF-8 bytes: 3-byte CJK outweighs a longer ASCII field
+    result = {"success": True, "ascii": "a" * 30_000, "cjk": "漢" * 20_000}
+    original = len(jsonio.dumpb(result))
+    Config.MAX_SNAPSHOT_BYTES = original - 1_000
+    out = truncate(result, original)
+    check(f"{label}: multibyte field ranked by bytes", out["truncated_fields"] == ["cjk"])
+    check(f"{label}: multibyte field cut by bytes, not ~3x chars",
+          len(out["cjk"].encode()) >= len(result["cjk"].encode()) - 1_000 - 300)
+    check(f"{label}: cut lands on a character boundary", out["cjk"].startswith("漢" * 100)
+          and "\ufffd" not in out["cjk"])
+
+
+_orig_cap = Config.MAX_SNAPSHOT_BYTES
+_orig_orjson = jsonio.orjson
+backends = [("stdlib", None)]
+if _orig_orjson is not None:
+    backends.insert(0, ("orjson", _orig_orjson))
+else:
+    print("orjson not installed — stdlib back end only")
+try:
+    for backend, mod in backends:
+        jsonio.orjson = mod
+        _run(f"agent/{backend}", agent._truncate_result)
+        _run(f"server/{backend}", server._truncate_result)
+finally:
+    jsonio.orjson = _orig_orjson
+    Config.MAX_SNAPSHOT_BYTES = _orig_cap
+
+print(f"\n{_PASS} passed, {_FAIL} failed")
+sys.exit(1 if _FAIL else 0)
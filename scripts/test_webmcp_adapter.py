@@ -22,7 +22,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from actions import _WEBMCP_DISCOVER_JS, _WEBMCP_CALL_JS   # noqa: E402
-from browser_engine import WEBMCP_INIT_SCRIPT              # noqa: E402
+from browser_engine import WEBMCP_INIT_SCRIPT, _WEBMCP_INIT_SCRIPT_MIN   # noqa: E402
 from playwright.async_api import async_playwright          # noqa: E402
 
 _PASS = _FAIL = 0
@@ -180,6 +180,28 @@ async def main():
         chk("read-only tool auto-proceeds (no gate)", ro == "status-ok", str(ro)[:120])
         await page.close()
 
+        # --- Scenario C2: the minified init script (what actually ships) ----------
+        print("--- Scenario C2: minified interceptor parses and behaves the same ---")
+        _globals = "() => Object.getOwnPropertyNames(window).filter(n => n.startsWith('__'))"
+        _shape = "() => Object.keys(window.__webmcp).sort()"
+        page = await ctx.new_page()
+        await page.goto("about:blank")
+        await page.evaluate(_INJECT_PUBLISHER_ONLY)
+        await page.evaluate(WEBMCP_INIT_SCRIPT)
+        full_globals, full_shape = await page.evaluate(_globals), await page.evaluate(_shape)
+        await page.close()
+        page = await ctx.new_page()
+        await page.goto("about:blank")
+        await page.evaluate(_INJECT_PUBLISHER_ONLY)
+        await page.evaluate(_WEBMCP_INIT_SCRIPT_MIN)
+        chk("minified script defines the same globals", await page.evaluate(_globals) == full_globals)
+        chk("minified script builds the same __webmcp", await page.evaluate(_shape) == full_shape)
+        await page.evaluate(_REGISTER_GATED_TOOLS)
+        gated = await page.evaluate(_WEBMCP_CALL_JS, ["buyNow", "{}", None, False])
+        chk("minified script gates mutating tools",
+            isinstance(gated, dict) and gated.get("_requires_user_interaction") is True, str(gated)[:160])
+        await page.close()
+
         # --- Scenario D: action_webmcp_call param handling (FakePage, no browser) ---
         print("--- Scenario D: allow_sensitive coercion + origin threading ---")
         from actions import action_webmcp_call